@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+""" Load test for the chord render service (`python -m fretboard.server`).
+
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 -c 50 -n 20000
+
+Opens ``-c`` keep-alive connections and spreads ``-n`` requests over them,
+cycling through a set of chord URLs. With ``--revalidate``, every other request
+sends back the ETag it last saw for that URL, to exercise ``304`` responses.
+Reports throughput, latency percentiles and status counts.
+"""
+import argparse
+import asyncio
+import collections
+import itertools
+import sys
+import time
+from urllib.parse import urlsplit
+
+SHAPES = (
+    ('xx0232', '---132'),
+    ('133211', '134211'),
+    ('x-15-14-11-12-11', '-43121'),
+    ('320033', '21--34'),
+    ('x32010', '-32-1-'),
+    ('022000', '-23---'),
+)
+
+UKULELE_SHAPES = (
+    ('0003', '---3'),
+    ('0232', '-132'),
+    ('2010', '2-1-'),
+    ('0212', '-213'),
+    ('2000', '1---'),
+    ('2220', '123-'),
+)
+
+QUERIES = ('', '?orientation=landscape', '?instrument=ukulele', '?width=400')
+
+
+def chord_paths():
+    for index, query in itertools.product(range(len(SHAPES)), QUERIES):
+        positions, fingers = (UKULELE_SHAPES if 'ukulele' in query else SHAPES)[index]
+        yield '/chord/{0}/{1}.svg{2}'.format(positions, fingers, query)
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers
+
+
+async def client(host, port, host_header, paths, count, revalidate, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        for index in range(count):
+            path = next(paths)
+            request = 'GET {0} HTTP/1.1\r\nHost: {1}\r\n'.format(path, host_header)
+            if revalidate and index % 2 and path in etags:
+                request += 'If-None-Match: {0}\r\n'.format(etags[path])
+            request += '\r\n'
+
+            start = time.time()
+            writer.write(request.encode('latin-1'))
+            status, headers = await read_response(reader)
+            latencies.append(time.time() - start)
+            statuses[status] += 1
+
+            if 'etag' in headers:
+                etags[path] = headers['etag']
+    finally:
+        writer.close()
+
+
+async def run(args):
+    url = urlsplit(args.url)
+    paths = itertools.cycle(list(chord_paths()))
+    latencies = []
+    statuses = collections.Counter()
+
+    per_client, remainder = divmod(args.requests, args.concurrency)
+    start = time.time()
+    await asyncio.gather(*[
+        client(url.hostname, url.port or 80, url.netloc, paths,
+               per_client + (1 if index < remainder else 0),
+               args.revalidate, latencies, statuses)
+        for index in range(args.concurrency)
+    ])
+    elapsed = time.time() - start
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    print('{0} requests in {1:.2f}s: {2:.0f} req/s'.format(len(latencies), elapsed, len(latencies) / elapsed))
+    print('latency p50 {0:.2f}ms  p90 {1:.2f}ms  p99 {2:.2f}ms  max {3:.2f}ms'.format(
+        percentile(.5), percentile(.9), percentile(.99), latencies[-1] * 1000))
+    print('status ' + '  '.join('{0}: {1}'.format(*item) for item in sorted(statuses.items())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('-c', '--concurrency', type=int, default=20)
+    parser.add_argument('-n', '--requests', type=int, default=5000)
+    parser.add_argument('--revalidate', action='store_true')
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,480 @@
+#!/usr/bin/env python
+""" Benchmarks for the parse, draw and render hot paths.
+
+    python benchmarks/run.py                          # run everything
+    python benchmarks/run.py -k landscape             # only matching benchmarks
+    python benchmarks/run.py --save baseline.json     # record a baseline
+    python benchmarks/run.py --compare baseline.json  # fail on regressions
+
+Each benchmark reports the best time per call over several repeats and the
+peak memory allocated by a single call. The render cache is disabled while
+timing, so every call does the full work; the skeleton cache is left at its
+defaults.
+
+Checks run first, selected by ``-k`` the same way, and fail the run if the
+output they cover is wrong, e.g. if the backends stop drawing the same
+diagram.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'demo'))
+
+import fretboard
+from diagrams import diagrams
+
+# `import fretboard` must stay under this many seconds in a fresh interpreter.
+IMPORT_BUDGET = 0.05
+
+BACKENDS = ('svgwrite', 'string', 'compact')
+
+CHORDS = (
+    (fretboard.Chord, 'xx0232', '---132'),
+    (fretboard.Chord, '133211', '134211'),
+    (fretboard.Chord, 'x-15-14-11-12-11', '-43121'),
+    (fretboard.Chord, '320033', '21--34'),
+    (fretboard.UkuleleChord, 'x232', '-132'),
+    (fretboard.BassChord, 'x221', '-321'),
+)
+
+BENCHMARKS = []
+
+# Where save benchmarks write; created and removed by `main()`.
+OUTPUT_DIR = None
+
+
+def benchmark(name, number=100):
+    """ Register a benchmark. The decorated function does any setup and
+    returns the callable to time.
+    """
+    def decorator(func):
+        BENCHMARKS.append((name, func, number))
+        return func
+    return decorator
+
+
+CHECKS = []
+
+
+def check(name):
+    """ Register a check. The decorated function raises an exception
+    (usually AssertionError) if something is wrong.
+    """
+    def decorator(func):
+        CHECKS.append((name, func))
+        return func
+    return decorator
+
+
+def diagram_name(filename):
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def get_fretboard(diagram):
+    if isinstance(diagram, fretboard.Fretboard):
+        return diagram
+    return diagram.get_fretboard()
+
+
+@benchmark('chord.parse', number=2000)
+def chord_parse():
+    def run():
+        for cls, positions, fingers in CHORDS:
+            cls(positions=positions, fingers=fingers)
+    return run
+
+
+def register_demo_benchmarks():
+    for filename, diagram in diagrams():
+        name = diagram_name(filename)
+
+        if isinstance(diagram, fretboard.Chord):
+            BENCHMARKS.append(('{0}.chord-draw'.format(name), lambda diagram=diagram: diagram.get_fretboard, 500))
+
+        for backend in BACKENDS:
+            def fretboard_draw(diagram=diagram, backend=backend):
+                fb = get_fretboard(diagram)
+                return lambda: fb.draw(backend)
+
+            def render(diagram=diagram, backend=backend):
+                return lambda: diagram.render(backend=backend)
+
+            def save(diagram=diagram, backend=backend):
+                path = os.path.join(OUTPUT_DIR, 'diagram.svg')
+                return lambda: diagram.save(path, backend=backend)
+
+            BENCHMARKS.append(('{0}.draw[{1}]'.format(name, backend), fretboard_draw, 200))
+            BENCHMARKS.append(('{0}.render[{1}]'.format(name, backend), render, 200))
+            BENCHMARKS.append(('{0}.save[{1}]'.format(name, backend), save, 100))
+
+
+register_demo_benchmarks()
+
+
+def landscape_neck():
+    fb = fretboard.Fretboard(frets=(0, 24), style={
+        'drawing': {'orientation': 'landscape', 'width': 2400},
+    })
+    fb.add_markers(
+        strings=[index % 6 for index in range(150)],
+        frets=[index % 25 for index in range(150)],
+        labels=[str(index % 12) for index in range(150)],
+    )
+    return fb
+
+
+for backend in BACKENDS:
+    benchmark('stress.landscape-150-markers[{0}]'.format(backend), number=10)(
+        lambda backend=backend: lambda: landscape_neck().render(backend=backend)
+    )
+
+    @benchmark('stress.batch-10000-chords[{0}]'.format(backend), number=1)
+    def batch(backend=backend):
+        shapes = [CHORDS[index % len(CHORDS)] for index in range(10000)]
+
+        def run():
+            for cls, positions, fingers in shapes:
+                cls(positions=positions, fingers=fingers).render(backend=backend)
+        return run
+
+
+@benchmark('sheet.transpositions', number=50)
+def sheet_transpositions():
+    # All twelve keys of two movable shapes, sharing their necks.
+    shapes = [
+        fretboard.Chord(positions='133211', fingers='134211'),
+        fretboard.Chord(positions='x32010', fingers='-32-1-'),
+    ]
+    return lambda: fretboard.Sheet(
+        [chord for shape in shapes for chord in shape.transpositions()], columns=6,
+    ).render()
+
+
+@benchmark('stress.fingering-all-voicings', number=1)
+def fingering_all_voicings():
+    # A cold solve of every common chord's voicings.
+    from fretboard import fingering
+    from fretboard.voicings import all_voicings
+
+    shapes = [shape for shapes in all_voicings().values() for shape in shapes]
+
+    def run():
+        fingering._solutions.clear()
+        fingering.fingerings(shapes)
+    return run
+
+
+@benchmark('stress.scales-all-keys', number=5)
+def scales_all_keys():
+    # Every scale in every key over a full neck, for a few instruments.
+    from fretboard.scales import SCALES
+    from fretboard.theory import NOTE_NAMES
+
+    def run():
+        for instrument in ('guitar', 'guitar-7', 'bass', 'ukulele'):
+            for root in NOTE_NAMES:
+                for scale in SCALES:
+                    fretboard.Fretboard(frets=(0, 24), instrument=instrument).add_scale(root, scale)
+    return run
+
+
+def svg_elements(svg):
+    # (tag, attributes, text) for each drawn element of a document.
+    import xml.etree.ElementTree as ElementTree
+
+    root = ElementTree.fromstring(svg.encode('utf-8'))
+    return [
+        (element.tag.split('}')[-1], element.attrib, element.text)
+        for element in root.iter()
+        if element.tag.split('}')[-1] in ('circle', 'line', 'rect', 'text')
+    ]
+
+
+def same_value(a, b, tolerance):
+    try:
+        return abs(float(a) - float(b)) <= tolerance
+    except ValueError:
+        return a == b
+
+
+def check_same_drawing(name, expected, actual, attributes=None, tolerance=1e-9):
+    # Compare two documents element by element, whatever order their
+    # attributes were written in.
+    expected = svg_elements(expected)
+    actual = svg_elements(actual)
+    assert len(expected) == len(actual), '{0}: {1} elements, expected {2}'.format(
+        name, len(actual), len(expected))
+
+    for index, ((tag, want, text), (other_tag, got, other_text)) in enumerate(zip(expected, actual)):
+        assert (tag, text) == (other_tag, other_text), '{0}: element {1} is {2} {3!r}, expected {4} {5!r}'.format(
+            name, index, other_tag, other_text, tag, text)
+        for attribute in (attributes or set(want) | set(got)):
+            if attribute not in want and attribute not in got:
+                continue
+            assert attribute in want and attribute in got and same_value(want[attribute], got[attribute], tolerance), \
+                '{0}: element {1} ({2}) has {3}={4!r}, expected {5!r}'.format(
+                    name, index, tag, attribute, got.get(attribute), want.get(attribute))
+
+
+def check_diagrams():
+    # Every demo diagram, plus one with labels that aren't strings.
+    for filename, diagram in diagrams():
+        yield diagram_name(filename), diagram
+
+    fb = fretboard.Fretboard()
+    fb.add_marker(string=1, fret=2, label=1)
+    fb.add_string_label(string=0, label=0)
+    yield 'numeric-labels', fb
+
+
+# Positions and sizes, which the compact backend rounds but mustn't change.
+GEOMETRY_ATTRIBUTES = ('x', 'y', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy', 'r', 'width', 'height')
+
+
+@check('check.backends-same-geometry')
+def backends_same_geometry():
+    for name, diagram in check_diagrams():
+        expected = diagram.render(backend='svgwrite').getvalue()
+        check_same_drawing(name + '[string]', expected, diagram.render(backend='string').getvalue())
+        check_same_drawing(
+            name + '[compact]', expected, diagram.render(backend='compact').getvalue(),
+            attributes=GEOMETRY_ATTRIBUTES, tolerance=0.005,
+        )
+
+
+@check('check.compact-smaller')
+def compact_smaller():
+    for filename, diagram in diagrams():
+        name = diagram_name(filename)
+        default = len(diagram.render(backend='svgwrite').getvalue().encode('utf-8'))
+        compact = len(diagram.render(backend='compact').getvalue().encode('utf-8'))
+        assert compact < default, '{0}: compact output is {1} bytes, svgwrite {2}'.format(
+            name, compact, default)
+
+
+# Shapes with a settled fingering: the demo's chords (with the bass E's
+# '-321' solved as the equally good '-231') and the documented examples.
+FINGERINGS = (
+    ('xx0232', '---132'),
+    ('133211', '134211'),
+    ('x-15-14-11-12-11', '-43121'),
+    ('320033', '21--34'),
+    ('x232', '-132'),
+    ('x221', '-231'),
+    ('x32010', '-32-1-'),
+    ('x-5-7-7-6-5', '-13421'),
+    ('x24432', '-13421'),
+)
+
+
+@check('check.fingering')
+def fingering_examples():
+    from fretboard.fingering import fingering
+
+    for positions, expected in FINGERINGS:
+        fingers = fingering(positions)
+        assert fingers == expected, '{0}: fingered {1!r}, expected {2!r}'.format(
+            positions, fingers, expected)
+
+    # Moving an open shape up a fret puts a finger where the nut was, which
+    # has to agree with solving the moved shape from scratch.
+    chord = fretboard.Chord(positions='x32010', fingers='-32-1-').transpose(1)
+    assert ''.join(chord.fingers) == fingering(chord.positions), \
+        'x32010 up a fret: fingered {0!r}, expected {1!r}'.format(
+            ''.join(chord.fingers), fingering(chord.positions))
+
+
+# A small library with repeated names and shapes, a name shared between
+# instruments, a non-ASCII name, and an entry that must be rejected.
+LIBRARY = '''name,positions,fingers,instrument
+D,xx0232,---132,
+F,133211,134211,
+F,xx3211,--3211,
+Bø7,x2323x,,
+C,x32010,-32-1-,
+C,0003,---3,ukulele
+Am7,x02010,,
+C6,x02010,,
+D,x54232,,
+bad,xx0232,é-----,
+'''
+
+
+@check('check.library-index')
+def library_index():
+    import io
+    from fretboard.library import ChordIndex, iter_library, write_index
+
+    results = list(iter_library(io.StringIO(LIBRARY)))
+    errors = [result.line for result in results if result.error]
+    assert errors == [11], 'rejected lines {0}, expected [11]'.format(errors)
+    specs = [result.spec for result in results if result.spec]
+
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, 'chords.idx')
+        write_index(specs, filename)
+        with ChordIndex(filename) as index:
+            assert list(index) == specs, 'index entries differ from the library'
+            for spec in specs:
+                expected = [other for other in specs if other.name == spec.name]
+                found = index.find(spec.name)
+                assert found == expected, 'find({0!r}): {1}, expected {2}'.format(
+                    spec.name, found, expected)
+
+                expected = [
+                    other for other in specs
+                    if (other.positions, other.instrument) == (spec.positions, spec.instrument)
+                ]
+                found = index.find_shape(spec.positions, spec.instrument)
+                assert found == expected, 'find_shape({0}, {1!r}): {2}, expected {3}'.format(
+                    spec.positions, spec.instrument, found, expected)
+
+            assert index.find('E') == [] and index.find_shape('022100') == [], \
+                'found entries that are not in the library'
+    finally:
+        shutil.rmtree(directory)
+
+
+@check('check.identify')
+def identify_examples():
+    from fretboard.identify import identify
+    from fretboard.voicings import all_voicings
+
+    # The README's examples.
+    best = fretboard.Chord(positions='xx4210').identify()[0].name
+    assert best == 'F#m7b5', 'xx4210 identified as {0!r}, expected F#m7b5'.format(best)
+    names = [match.name for match in fretboard.Chord.identify_many(['x32010', '200232'])]
+    assert names == ['C', 'D/F#'], 'identify_many() named {0}, expected C, D/F#'.format(names)
+    first = fretboard.UkuleleChord.voicings('G7')[0]
+    assert first == '0212', 'first ukulele G7 voicing is {0!r}, expected 0212'.format(first)
+
+    # Every voicing of every common chord is named back as that chord.
+    for instrument in ('guitar', 'ukulele', 'bass'):
+        for name, shapes in sorted(all_voicings(instrument).items()):
+            for shape in shapes:
+                matches = [match.name for match in identify(shape, instrument=instrument)]
+                assert name in matches, '{0} voicing {1} of {2} identified as {3}'.format(
+                    instrument, shape, name, matches)
+
+
+def time_import(repeat=5):
+    code = (
+        'import time; start = time.time(); import fretboard; '
+        'print(time.time() - start)'
+    )
+    return min(
+        float(subprocess.check_output([sys.executable, '-c', code], cwd=ROOT))
+        for _ in range(repeat)
+    )
+
+
+def measure(setup, number, repeat):
+    func = setup()
+    seconds = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return '{0:.2f}s'.format(seconds)
+    if seconds >= 1e-3:
+        return '{0:.2f}ms'.format(seconds * 1e3)
+    return '{0:.1f}us'.format(seconds * 1e6)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', dest='keyword', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', metavar='FILE', help='write results to FILE as a baseline')
+    parser.add_argument('--compare', metavar='FILE', help='compare results against a baseline FILE')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fractional slowdown against the baseline that counts as a regression')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)
+
+    fretboard.Chord.cache = None
+    fretboard.Fretboard.cache = None
+
+    results = {}
+    failures = []
+
+    for name, func in CHECKS:
+        if args.keyword and args.keyword not in name:
+            continue
+        try:
+            func()
+        except Exception as e:
+            failures.append('{0}: {1}: {2}'.format(name, type(e).__name__, e))
+            print('{0:<48} {1:>10}'.format(name, 'FAIL'))
+        else:
+            print('{0:<48} {1:>10}'.format(name, 'ok'))
+
+    # Timing the import spawns several interpreters, so only do it when
+    # asked for by name.
+    if not args.keyword or 'import' in args.keyword:
+        seconds = time_import(args.repeat)
+        results['import'] = {'seconds': seconds, 'peak_bytes': None}
+        if seconds > IMPORT_BUDGET:
+            failures.append('import: {0} exceeds the {1} budget'.format(
+                format_seconds(seconds), format_seconds(IMPORT_BUDGET)))
+
+    global OUTPUT_DIR
+    OUTPUT_DIR = tempfile.mkdtemp()
+    try:
+        for name, setup, number in BENCHMARKS:
+            if args.keyword and args.keyword not in name:
+                continue
+            seconds, peak = measure(setup, number, args.repeat)
+            results[name] = {'seconds': seconds, 'peak_bytes': peak}
+    finally:
+        shutil.rmtree(OUTPUT_DIR)
+
+    for name, result in results.items():
+        line = '{0:<48} {1:>10}'.format(name, format_seconds(result['seconds']))
+        if result['peak_bytes'] is not None:
+            line += ' {0:>10.1f}KiB'.format(result['peak_bytes'] / 1024.)
+
+        if name in baseline:
+            change = result['seconds'] / baseline[name]['seconds'] - 1
+            line += ' {0:>+8.1%}'.format(change)
+            if change > args.threshold:
+                line += '  REGRESSION'
+                failures.append('{0}: {1:+.1%} slower than baseline'.format(name, change))
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as fd:
+            json.dump(results, fd, indent=2, sort_keys=True)
+
+    if failures:
+        print('')
+        for failure in failures:
+            print('FAIL ' + failure)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fretboard
+
+
+def diagrams():
+    """ Yield ``(filename, diagram)`` for every diagram in the demo. """
+
+    # Chord (D)
+    chord = fretboard.Chord(positions='xx0232', fingers='---132')
+    yield 'svg/D.svg', chord
+
+    # Barre chord (F#)
+    chord = fretboard.Chord(positions='133211', fingers='134211')
+    yield 'svg/F-barre.svg', chord
+
+    # C shape, higher up the neck
+    chord = fretboard.Chord(positions='x-15-14-11-12-11', fingers='-43121')
+    yield 'svg/C-shape.svg', chord
+
+    # Ukulele chord (G)
+    chord = fretboard.UkuleleChord(positions='x232', fingers='-132')
+    yield 'svg/ukulele-G.svg', chord
+
+    # Bass chord (E)
+    chord = fretboard.BassChord(positions='x221', fingers='-321')
+    yield 'svg/bass-E.svg', chord
+
+    # Fretboard w/ Rocksmith-style string colors (F#)
+    fb = fretboard.Fretboard(style={
+        'drawing': {'background_color': 'black'},
+        'fret': {'color': 'darkslategray'},
+        'nut': {'color': 'darkslategray'},
+        'marker': {'color': 'slategray', 'border_color': 'darkslategray'},
+        'string': {'color': 'slategray'},
+    })
+    fb.add_marker(string=(0, 5), fret=1, label='1')
+    fb.add_marker(string=1, fret=3, label='3')
+    fb.add_marker(string=2, fret=3, label='4')
+    fb.add_marker(string=3, fret=2, label='2')
+
+    fb.strings[0].color = 'red'
+    fb.strings[1].color = 'gold'
+    fb.strings[2].color = 'deepskyblue'
+    fb.strings[3].color = 'orange'
+    fb.strings[4].color = 'limegreen'
+    fb.strings[5].color = 'magenta'
+
+    yield 'svg/F-sharp-rocksmith.svg', fb
+
+    # Pentatonic scale shape w/ highlighted root notes
+    fb = fretboard.Fretboard(frets=(5, 8), style={'marker': {'color': 'cornflowerblue'}})
+    fb.add_scale('A', 'minor-pentatonic')
+    yield 'svg/pentatonic-shape.svg', fb
+
+    # Landscape G chord
+    chord = fretboard.Chord(positions='320033', fingers='21--34', style={
+        'drawing': {
+            'orientation': 'landscape',
+            'width': 400,
+        }
+    })
+    yield 'svg/G-landscape.svg', chord
+
+    # Landscape pentatonic
+    fb = fretboard.Fretboard(frets=(0, 12), style={
+        'drawing': {
+            'orientation': 'landscape',
+            'width': 1200
+        },
+        'marker': {'color': 'cornflowerblue'},
+    })
+    fb.add_scale('A', 'minor-pentatonic', frets=(5, 8))
+    yield 'svg/pentatonic-landscape.svg', fb
@@ -1,118 +1,83 @@
+import glob
+import hashlib
+import json
 import os
-import sys
 
 import invoke
 import livereload
 
-sys.path.append(os.path.abspath('..'))
-
-import fretboard
+from diagrams import diagrams, fretboard
+from fretboard.utils import write_atomic
 
 server = livereload.Server()
 
+MANIFEST = 'svg/.manifest.json'
+
+
+def library_fingerprint():
+    # Edits to the library should rebuild everything, even though they don't
+    # bump the version number.
+    digest = hashlib.sha1(fretboard.__version__.encode('utf-8'))
+    package_dir = os.path.dirname(os.path.abspath(fretboard.__file__))
+    for path in sorted(glob.glob(os.path.join(package_dir, '*.py'))):
+        with open(path, 'rb') as fd:
+            digest.update(fd.read())
+    return digest.hexdigest()
+
+
+def content_key(diagram, fingerprint):
+    spec = diagram.cache_key()
+    return hashlib.sha1('{0}:{1!r}'.format(fingerprint, spec).encode('utf-8')).hexdigest()
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST) as fd:
+            return json.load(fd)
+    except (IOError, ValueError):
+        return {}
+
 
 @invoke.task
 def clean(ctx):
     os.system('rm -rf ./svg/*.svg')
+    if os.path.exists(MANIFEST):
+        os.remove(MANIFEST)
 
 
 @invoke.task
-def build(ctx):
-    # Chord (D)
-    chord = fretboard.Chord(positions='xx0232', fingers='---132')
-    chord.save('svg/D.svg')
-
-    # Barre chord (F#)
-    chord = fretboard.Chord(positions='133211', fingers='134211')
-    chord.save('svg/F-barre.svg')
-
-    # C shape, higher up the neck
-    chord = fretboard.Chord(positions='x-15-14-11-12-11', fingers='-43121')
-    chord.save('svg/C-shape.svg')
-
-    # Ukulele chord (G)
-    chord = fretboard.UkuleleChord(positions='x232', fingers='-132')
-    chord.save('svg/ukulele-G.svg')
-
-    # Bass chord (E)
-    chord = fretboard.BassChord(positions='x221', fingers='-321')
-    chord.save('svg/bass-E.svg')
-
-    # Fretboard w/ Rocksmith-style string colors (F#)
-    fb = fretboard.Fretboard(style={
-        'drawing': {'background_color': 'black'},
-        'fret': {'color': 'darkslategray'},
-        'nut': {'color': 'darkslategray'},
-        'marker': {'color': 'slategray', 'border_color': 'darkslategray'},
-        'string': {'color': 'slategray'},
-    })
-    fb.add_marker(string=(0, 5), fret=1, label='1')
-    fb.add_marker(string=1, fret=3, label='3')
-    fb.add_marker(string=2, fret=3, label='4')
-    fb.add_marker(string=3, fret=2, label='2')
-
-    fb.strings[0].color = 'red'
-    fb.strings[1].color = 'gold'
-    fb.strings[2].color = 'deepskyblue'
-    fb.strings[3].color = 'orange'
-    fb.strings[4].color = 'limegreen'
-    fb.strings[5].color = 'magenta'
-
-    fb.save('svg/F-sharp-rocksmith.svg')
-
-    # Pentatonic scale shape w/ highlighted root notes
-    fb = fretboard.Fretboard(frets=(5, 8), style={'marker': {'color': 'cornflowerblue'}})
-    fb.add_marker(string=0, fret=5, label='A', color='salmon')
-    fb.add_marker(string=1, fret=5, label='D')
-    fb.add_marker(string=2, fret=5, label='G')
-    fb.add_marker(string=3, fret=5, label='C')
-    fb.add_marker(string=4, fret=5, label='E')
-    fb.add_marker(string=5, fret=5, label='A', color='salmon')
-
-    fb.add_marker(string=0, fret=8, label='C')
-    fb.add_marker(string=1, fret=7, label='E')
-    fb.add_marker(string=2, fret=7, label='A', color='salmon')
-    fb.add_marker(string=3, fret=7, label='D')
-    fb.add_marker(string=4, fret=8, label='G')
-    fb.add_marker(string=5, fret=8, label='C')
-    fb.save('svg/pentatonic-shape.svg')
-
-    # Landscape G chord
-    chord = fretboard.Chord(positions='320033', fingers='21--34', style={
-        'drawing': {
-            'orientation': 'landscape',
-            'width': 400,
-        }
-    })
-    chord.save('svg/G-landscape.svg')
-
-    # Landscape pentatonic
-    fb = fretboard.Fretboard(frets=(0, 12), style={
-        'drawing': {
-            'orientation': 'landscape',
-            'width': 1200
-        },
-        'marker': {'color': 'cornflowerblue'},
-    })
-    fb.add_marker(string=0, fret=5, label='A', color='salmon')
-    fb.add_marker(string=1, fret=5, label='D')
-    fb.add_marker(string=2, fret=5, label='G')
-    fb.add_marker(string=3, fret=5, label='C')
-    fb.add_marker(string=4, fret=5, label='E')
-    fb.add_marker(string=5, fret=5, label='A', color='salmon')
-
-    fb.add_marker(string=0, fret=8, label='C')
-    fb.add_marker(string=1, fret=7, label='E')
-    fb.add_marker(string=2, fret=7, label='A', color='salmon')
-    fb.add_marker(string=3, fret=7, label='D')
-    fb.add_marker(string=4, fret=8, label='G')
-    fb.add_marker(string=5, fret=8, label='C')
-    fb.save('svg/pentatonic-landscape.svg')
-
-
-@invoke.task(pre=[clean, build])
+def build(ctx, workers=None):
+    manifest = load_manifest()
+    fingerprint = library_fingerprint()
+
+    keys = {}
+    stale = []
+    for filename, diagram in diagrams():
+        keys[filename] = content_key(diagram, fingerprint)
+        if manifest.get(filename) != keys[filename] or not os.path.exists(filename):
+            stale.append((filename, diagram))
+
+    results = fretboard.render_many(
+        [diagram for _, diagram in stale],
+        workers=int(workers) if workers else None,
+    )
+
+    for (filename, _), result in zip(stale, results):
+        if result.error:
+            print('{0}: {1}'.format(filename, result.error))
+            # Leave it out of the manifest so the next build tries again.
+            keys[filename] = None
+        else:
+            write_atomic(filename, result.svg)
+
+    write_atomic(MANIFEST, json.dumps(keys, indent=2, sort_keys=True))
+    print('Rebuilt {0} of {1} diagrams'.format(len(stale), len(keys)))
+
+
+@invoke.task(pre=[build])
 def serve(ctx):
     server.watch(__file__, lambda: os.system('invoke build'))
+    server.watch('diagrams.py', lambda: os.system('invoke build'))
     server.watch('index.html', lambda: os.system('invoke build'))
     server.watch('../fretboard/', lambda: os.system('invoke build'))
 
@@ -1,5 +1,10 @@
+from .batch import render_many
+from .cache import RenderCache, render_cache
 from .chord import Chord, BassChord, UkuleleChord
 from .fretboard import Fretboard
+from .incremental import IncrementalRenderer
+from .sheet import Sheet
+from .stats import RenderStats
 
 __version__ = '1.0.0'
 __author__ = 'Derek Payton <derek.payton@gmail.com>'
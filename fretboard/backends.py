@@ -0,0 +1,79 @@
+from io import StringIO
+
+from . import svg
+
+
+def svgwrite_backend(size):
+    # svgwrite is slow to import (it builds its validation tables up front),
+    # so only pay for it once something is actually drawn with it.
+    import svgwrite
+    return svgwrite.Drawing(size=size)
+
+
+def string_backend(size):
+    return svg.Document(size=size)
+
+
+def compact_backend(size):
+    # For a different precision, pass
+    # functools.partial(svg.CompactDocument, precision=...) as the backend.
+    return svg.CompactDocument(size=size)
+
+
+# A backend is a callable taking the drawing size and returning an object with
+# the subset of the `svgwrite.Drawing` API used by `Fretboard.draw()`.
+BACKENDS = {
+    'svgwrite': svgwrite_backend,
+    'string': string_backend,
+    'compact': compact_backend,
+}
+
+
+def get_backend(backend):
+    if callable(backend):
+        return backend
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError('Unknown rendering backend: {0!r}'.format(backend))
+
+
+def backend_key(backend):
+    """ Describe ``backend`` for `Fretboard.render_key()`: the same from one
+    process to the next, and different whenever the output could be. That's
+    a registered backend's name, a function or class's ``module.qualname``,
+    or for a `functools.partial` its function's key with the arguments.
+    Raises ValueError for callables that can't be described that way
+    (lambdas, instances, arguments without a stable repr).
+    """
+    if isinstance(backend, str):
+        return backend
+
+    import functools
+
+    if isinstance(backend, functools.partial):
+        arguments = repr((backend.args, sorted(backend.keywords.items())))
+        if ' at 0x' in arguments:
+            raise ValueError('Can\'t key the arguments of backend {0!r}'.format(backend))
+        return 'partial({0}, {1})'.format(backend_key(backend.func), arguments)
+
+    module = getattr(backend, '__module__', None)
+    name = getattr(backend, '__qualname__', None)
+    if module is None or name is None or '<' in name:
+        raise ValueError(
+            'Can\'t key backend {0!r}; pass a named function or class, or a '
+            'functools.partial of one'.format(backend))
+    return '{0}.{1}'.format(module, name)
+
+
+def iter_chunks(drawing):
+    """ Yield the serialized document of a backend's drawing in pieces. Our
+    own documents stream element by element; anything else (svgwrite) only
+    serializes as a whole, so that's a single chunk.
+    """
+    if hasattr(drawing, 'iter_chunks'):
+        return drawing.iter_chunks()
+
+    output = StringIO()
+    drawing.write(output)
+    return iter([output.getvalue()])
@@ -0,0 +1,121 @@
+import collections
+import os
+
+from .chord import Chord, BassChord, UkuleleChord
+from .fretboard import Fretboard
+from .utils import write_atomic
+
+
+DIAGRAM_TYPES = {
+    'Chord': Chord,
+    'BassChord': BassChord,
+    'UkuleleChord': UkuleleChord,
+    'Fretboard': Fretboard,
+}
+
+RenderResult = collections.namedtuple('RenderResult', ('index', 'svg', 'filename', 'error'))
+
+
+def build_diagram(spec):
+    """ Build a `Chord` or `Fretboard` from a spec.
+
+    A spec is either a ready-made diagram or a dict of constructor arguments,
+    with a ``type`` key naming an entry in `DIAGRAM_TYPES` (default
+    ``'Chord'``) and an optional ``filename``. Fretboard specs may also carry
+    ``markers`` and ``string_labels`` (lists of keyword arguments for
+    `Fretboard.add_marker()` and `Fretboard.add_string_label()`) and
+    ``string_colors``.
+    """
+    if hasattr(spec, 'render'):
+        return spec
+
+    spec = dict(spec)
+    spec.pop('filename', None)
+    cls = spec.pop('type', 'Chord')
+    if not isinstance(cls, type):
+        cls = DIAGRAM_TYPES[cls]
+
+    if not issubclass(cls, Fretboard):
+        return cls(**spec)
+
+    markers = spec.pop('markers', ())
+    string_labels = spec.pop('string_labels', ())
+    string_colors = spec.pop('string_colors', ())
+
+    diagram = cls(**spec)
+    for marker in markers:
+        diagram.add_marker(**marker)
+    for label in string_labels:
+        diagram.add_string_label(**label)
+    for string, color in zip(diagram.strings, string_colors):
+        string.color = color
+    return diagram
+
+
+def _render_one(args):
+    index, spec, output_dir, backend = args
+    filename = None
+    try:
+        svg = build_diagram(spec).render(backend=backend).getvalue()
+        if output_dir is None:
+            return RenderResult(index, svg, None, None)
+
+        name = spec.get('filename') if isinstance(spec, dict) else None
+        filename = os.path.join(output_dir, name or '{0}.svg'.format(index))
+        write_atomic(filename, svg)
+        return RenderResult(index, None, filename, None)
+    except Exception as e:
+        return RenderResult(index, None, filename, '{0}: {1}'.format(type(e).__name__, e))
+
+
+def render_many(specs, workers=None, output_dir=None, backend=None, chunksize=None):
+    """ Render many diagram specs (see `build_diagram()`) across a pool of
+    ``workers`` processes, defaulting to one per CPU.
+
+    Returns a list of `RenderResult`, in the same order as ``specs``. Without
+    ``output_dir`` each result carries the rendered ``svg``; with it, each
+    diagram is saved to ``output_dir`` (as its spec's ``filename``, or
+    ``<index>.svg``) and the result carries the ``filename`` instead. A
+    diagram that fails to render, or can't be sent to a worker process,
+    doesn't stop the batch; its result has ``error`` set to a description of
+    the exception.
+    """
+    import multiprocessing
+
+    specs = list(specs)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    jobs = [(index, spec, output_dir, backend) for index, spec in enumerate(specs)]
+
+    if workers <= 1 or len(jobs) <= 1:
+        return [_render_one(job) for job in jobs]
+
+    # A spec that can't be sent to a worker (e.g. a style holding a lambda)
+    # would abort the whole pool, so catch those up front.
+    import pickle
+
+    results = [None] * len(jobs)
+    sendable = []
+    for job in jobs:
+        try:
+            pickle.dumps(job, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            results[job[0]] = RenderResult(job[0], None, None, '{0}: {1}'.format(type(e).__name__, e))
+        else:
+            sendable.append(job)
+
+    if chunksize is None:
+        # A few chunks per worker keeps the pool balanced without paying
+        # the IPC round trip for every diagram.
+        chunksize = max(1, len(sendable) // (workers * 4))
+
+    if sendable:
+        pool = multiprocessing.Pool(min(workers, len(sendable)))
+        try:
+            for result in pool.imap(_render_one, sendable, chunksize):
+                results[result.index] = result
+        finally:
+            pool.close()
+            pool.join()
+    return results
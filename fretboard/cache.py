@@ -0,0 +1,99 @@
+import collections
+import threading
+
+
+class RenderCache(object):
+    """ A size-bounded LRU cache of finished SVG documents.
+
+    Entries are evicted, least recently used first, once the cache holds more
+    than ``max_entries`` documents or more than ``max_bytes`` of SVG. Either
+    limit may be ``None`` to leave it unbounded.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            # Re-insert to mark the entry as most recently used.
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        size = len(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Never going to fit, don't flush the whole cache trying.
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+
+            self._entries[key] = value
+            self._size += size
+
+            while self._entries and self._over_limit():
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _over_limit(self):
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        if self.max_bytes is not None and self._size > self.max_bytes:
+            return True
+        return False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+# Shared by Chord and Fretboard; set their ``cache`` attribute to ``None`` to
+# disable caching, or to a new RenderCache to use different limits.
+render_cache = RenderCache()
+
+# Neck skeletons drawn by `Fretboard.draw_skeleton()`. Entries are tuples of
+# backend elements, so sizes here count elements rather than bytes.
+skeleton_cache = RenderCache(max_entries=256, max_bytes=None)
@@ -1,51 +1,209 @@
-import copy
+from .cache import render_cache
+from .fretboard import Fretboard, render_cached, stream_svg
+from .instruments import MAX_FRET, InstrumentDefault, get_instrument
+from .stats import RenderRecord, phase
+from .style import merge_style
+from .utils import open_output, write_chunks
 
-import attrdict
-import svgwrite
-import yaml
 
-from .compat import StringIO
-from .fretboard import Fretboard
-from .utils import dict_merge
+CHORD_STYLE = {
+    'string': {
+        'muted_font_color': 'silver',
+        'open_font_color': 'steelblue',
+    },
+}
 
 
-CHORD_STYLE = '''
-string:
-    muted_font_color: silver
-    open_font_color: steelblue
-'''
+def parse_positions(positions):
+    """ Parse a positions string, one character per string (``'xx0232'``) or
+    dash-separated (``'x-15-14-11-12-11'``), into a list of frets with None
+    for muted strings.
+    """
+    if not positions:
+        return []
+    if '-' in positions:
+        positions = positions.split('-')
+    return [int(p) if p.isdigit() else None for p in positions]
+
+
+def format_positions(positions):
+    """ The inverse of `parse_positions()`: a positions string for a list of
+    frets, dash-separated if any fret has two digits.
+    """
+    frets = ['x' if fret is None else str(fret) for fret in positions]
+    if any(len(fret) > 1 for fret in frets):
+        return '-'.join(frets)
+    return ''.join(frets)
+
+
+def find_barre(fingers):
+    """ The barre in a fingering: ``(finger, first string, last string)`` for
+    the finger holding down more than one string (the one nearest the first
+    string, if several do), or None.
+    """
+    first = {}
+    last = {}
+    for index, finger in enumerate(fingers):
+        if finger.isdigit():
+            first.setdefault(finger, index)
+            last[finger] = index
+
+    repeated = [(index, finger) for finger, index in first.items() if last[finger] != index]
+    if not repeated:
+        return None
+    start, finger = min(repeated)
+    return finger, start, last[finger]
+
+
+def transpose_fingers(positions, transposed, fingers):
+    """ The fingering for a shape moved from ``positions`` to ``transposed``,
+    given its ``fingers`` (a list of characters), or an empty list when it
+    can't be worked out.
+
+    Moving a shape with open strings up the neck, the index finger barres in
+    place of the nut and the other fingers move up one. Moving down until
+    the index finger's notes are open strings is the reverse.
+    """
+    if not fingers:
+        return []
+
+    fingers = list(fingers) + ['-'] * (len(positions) - len(fingers))
+    for index, (fret, new_fret) in enumerate(zip(positions, transposed)):
+        if new_fret == 0 and fret != 0:
+            fingers[index] = '-'
+
+    if any(fret == 0 and new_fret for fret, new_fret in zip(positions, transposed)):
+        fingers = [str(int(finger) + 1) if finger.isdigit() else finger for finger in fingers]
+        for index, (fret, new_fret) in enumerate(zip(positions, transposed)):
+            if fret == 0 and new_fret:
+                fingers[index] = '1'
+    elif '1' not in fingers and any(finger.isdigit() for finger in fingers):
+        fingers = [str(int(finger) - 1) if finger.isdigit() else finger for finger in fingers]
+
+    if any(finger.isdigit() and not 1 <= int(finger) <= 4 for finger in fingers):
+        return []
+    return fingers
 
 
 class Chord(object):
-    default_style = dict_merge(
-        yaml.safe_load(CHORD_STYLE),
-        Fretboard.default_style
+    default_style = merge_style(
+        Fretboard.default_style,
+        CHORD_STYLE
     )
-    inlays = Fretboard.inlays
-    strings = 6
-
-    def __init__(self, positions=None, fingers=None, style=None):
-        if positions is None:
-            positions = []
-        elif '-' in positions:
-            positions = positions.split('-')
-        else:
-            positions = list(positions)
-        self.positions = list(map(lambda p: int(p) if p.isdigit() else None, positions))
 
+    # See `Fretboard.instrument`.
+    instrument = 'guitar'
+
+    # The instrument's string count and inlays, unless overridden.
+    strings = InstrumentDefault('strings')
+    inlays = InstrumentDefault('inlays')
+
+    # Passed through to Fretboard; see `Fretboard.backend`.
+    backend = Fretboard.backend
+
+    # Finished documents are cached by `cache_key()`; set to None to disable.
+    cache = render_cache
+
+    # See `Fretboard.stats`.
+    stats = None
+
+    def __init__(self, positions=None, fingers=None, style=None, instrument=None):
+        """ ``fingers`` is a string with a finger for each string (``'-'``
+        where none is needed), or ``'auto'`` to work one out; see
+        `fingering.fingering()`.
+        """
+        self.instrument = get_instrument(instrument or self.instrument)
+
+        self.positions = parse_positions(positions)
+
+        if fingers == 'auto':
+            from .fingering import fingering
+            fingers = fingering(self.positions)
         self.fingers = list(fingers) if fingers else []
 
-        self.style = attrdict.AttrDict(
-            dict_merge(
-                copy.deepcopy(self.default_style),
-                style or {}
-            )
+        self.style = merge_style(self.default_style, style)
+
+    @classmethod
+    def voicings(cls, name, **options):
+        """ Positions strings for playable voicings of the chord ``name`` on
+        this instrument; see `voicings.voicings()` for the options.
+        """
+        from .voicings import voicings
+        return voicings(name, instrument=cls.instrument, **options)
+
+    @classmethod
+    def identify_many(cls, shapes):
+        """ The best `identify.ChordMatch` for each of ``shapes`` (positions
+        strings or lists) on this instrument, or None where nothing matches.
+        """
+        from .identify import identify_many
+        return identify_many(shapes, instrument=cls.instrument)
+
+    def identify(self):
+        """ Name this chord from its positions: a list of
+        `identify.ChordMatch`, best first, empty if nothing matches.
+        """
+        from .identify import identify
+        return identify(self.positions, instrument=self.instrument)
+
+    def transpose(self, semitones):
+        """ This shape moved ``semitones`` frets up the neck (down, if
+        negative), as a new chord. Open strings move with it, held down by
+        the index finger, and strings that reach the nut become open. Raises
+        ValueError if the shape would run off either end of the neck.
+        """
+        positions = []
+        for fret in self.positions:
+            if fret is not None:
+                fret += semitones
+                if not 0 <= fret <= MAX_FRET:
+                    raise ValueError('{0} can\'t be moved {1} frets'.format(
+                        format_positions(self.positions), semitones))
+            positions.append(fret)
+
+        chord = type(self)(
+            positions=format_positions(positions),
+            style=self.style,
+            instrument=self.instrument,
+        )
+        chord.strings = self.strings
+        chord.inlays = self.inlays
+        chord.fingers = transpose_fingers(self.positions, positions, self.fingers)
+        if self.fingers and not chord.fingers:
+            from .fingering import fingering
+            chord.fingers = list(fingering(positions) or '')
+        return chord
+
+    def transpositions(self, semitones=range(12)):
+        """ This shape transposed by each of ``semitones`` (by default up
+        through all twelve keys, starting where it is). To render them
+        together, sharing one drawing of the neck, put them in a `Sheet`::
+
+            Sheet(chord.transpositions(), columns=6).save('svg/F-barre-keys.svg')
+        """
+        return [self.transpose(step) for step in semitones]
+
+    def cache_key(self, backend=None):
+        return (
+            type(self),
+            backend or self.backend,
+            self.strings,
+            tuple(self.inlays),
+            tuple(self.positions),
+            tuple(self.fingers),
+            self.style,
         )
 
+    def render_key(self, backend=None):
+        """ See `Fretboard.render_key()`. Chords are keyed by the fretboard
+        they draw, so two chords with the same output share a key.
+        """
+        return self.get_fretboard().render_key(backend or self.backend)
+
     def get_barre_fret(self):
-        for index, finger in enumerate(self.fingers):
-            if finger.isdigit() and self.fingers.count(finger) > 1:
-                return int(self.positions[index])
+        barre = find_barre(self.fingers)
+        if barre is not None:
+            return int(self.positions[barre[1]])
 
     def get_fret_range(self):
         fretted_positions = list(filter(lambda pos: isinstance(pos, int), self.positions))
@@ -55,25 +213,22 @@ class Chord(object):
             first_fret = min(filter(lambda pos: pos != 0, fretted_positions))
         return (first_fret, first_fret + 4)
 
-    def draw(self):
-        self.fretboard = Fretboard(
+    def get_fretboard(self):
+        fretboard = Fretboard(
             strings=self.strings,
             frets=self.get_fret_range(),
             inlays=self.inlays,
-            style=self.style
+            style=self.style,
+            instrument=self.instrument,
         )
 
         # Check for a barred fret (we'll need to know this later)
         barre_fret = None
-        for index, finger in enumerate(self.fingers):
-            if finger.isdigit() and self.fingers.count(finger) > 1:
-                barre_fret = self.positions[index]
-                barre_start = index
-                barre_end = len(self.fingers) - self.fingers[::-1].index(finger) - 1
-                break
-
-        if barre_fret is not None:
-            self.fretboard.add_marker(
+        barre = find_barre(self.fingers)
+        if barre is not None:
+            finger, barre_start, barre_end = barre
+            barre_fret = self.positions[barre_start]
+            fretboard.add_marker(
                 string=(barre_start, barre_end),
                 fret=barre_fret,
                 label=finger,
@@ -96,43 +251,64 @@ class Chord(object):
                 is_muted = True
 
             if is_muted or is_open:
-                self.fretboard.add_string_label(
+                fretboard.add_string_label(
                     string=string,
                     label='X' if is_muted else 'O',
                     font_color=self.style.string.muted_font_color if is_muted else self.style.string.open_font_color
 
                 )
-            elif fret is not None and fret != barre_fret:
+            elif fret is not None and not (fret == barre_fret and barre_start <= string <= barre_end):
                 # Add the fret marker
                 try:
                     finger = self.fingers[string]
                 except IndexError:
                     finger = None
 
-                self.fretboard.add_marker(
+                fretboard.add_marker(
                     string=string,
                     fret=fret,
                     label=finger,
                 )
 
-    def render(self, output=None):
-        self.draw()
+        return fretboard
+
+    def draw(self):
+        self.fretboard = self.get_fretboard()
+
+    def render_svg(self, backend=None):
+        record = RenderRecord(type(self).__name__) if self.stats is not None else None
+
+        # The fretboard is private to this call, so it's safe to draw in place.
+        fretboard = phase(record, 'chord', self.get_fretboard)
+        svg = fretboard.draw_svg(backend or self.backend, record)
+
+        if record is not None:
+            self.stats(record)
+        return svg
+
+    def render(self, output=None, backend=None):
+        return render_cached(self, output, backend)
+
+    def iter_svg(self, backend=None):
+        """ Yield the SVG document in chunks; see `Fretboard.iter_svg()`. """
+        def draw(backend, record):
+            fretboard = phase(record, 'chord', self.get_fretboard)
+            fretboard.draw(backend, record)
+            return fretboard
 
-        if output is None:
-            output = StringIO()
+        return stream_svg(self, backend, draw)
 
-        self.fretboard.render(output)
-        return output
+    def write_svg(self, fileobj, backend=None):
+        write_chunks(fileobj, self.iter_svg(backend))
 
-    def save(self, filename):
-        with open(filename, 'w') as output:
-            self.render(output)
+    def save(self, filename, backend=None):
+        with open_output(filename) as output:
+            self.write_svg(output, backend)
 
 
 class BassChord(Chord):
-    strings = 4
+    instrument = 'bass'
 
 
 class UkuleleChord(Chord):
-    strings = 4
-    inlays = (3, 5, 7, 10)
+    instrument = 'ukulele'
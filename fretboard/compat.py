@@ -1,5 +0,0 @@
-
-try:
-    from io import StringIO
-except ImportError:
-    from cStringIO import StringIO
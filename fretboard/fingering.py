@@ -0,0 +1,123 @@
+""" Work out which finger frets each note of a chord shape.
+
+    fingering('x32010')                        # '-32-1-'
+    fingering('x-5-7-7-6-5')                   # '-13421'
+    fingerings(Chord.voicings('Cmaj7'))
+
+Notes are taken in order of fret, then string, and fingers are handed out
+in the same order, so a finger either moves on to the next note, or stays
+down across it on the same fret as a barre. The cheapest assignment is found
+by dynamic programming over (finger, first string held by that finger),
+charging for fingers stretched or cramped against the frets between them and
+for barres. A solution depends only on the shape's frets relative to each
+other, so solutions are memoized under that, and a library of voicings
+costs a dict lookup for every shape after the first of its kind.
+"""
+from .chord import parse_positions
+
+
+FINGERS = 4
+
+# Cost of holding down more than one string with each finger.
+BARRE_COST = {1: 1, 2: 3, 3: 2, 4: 3}
+
+# Solutions are memoized by relative shape; the memo is cleared when full.
+MAX_SOLUTIONS = 65536
+
+_solutions = {}
+
+
+def normalize(positions):
+    # The shape with its lowest fretted note moved to the first fret.
+    fretted = [fret for fret in positions if fret]
+    if not fretted:
+        return tuple(positions)
+    offset = min(fretted) - 1
+    return tuple(fret - offset if fret else fret for fret in positions)
+
+
+def can_barre(shape, fret, first, last):
+    # Whether a finger across `fret` from string `first` to `last` leaves
+    # the notes on every string it covers sounding.
+    return all(shape[string] and shape[string] >= fret for string in range(first, last + 1))
+
+
+def solve(shape):
+    """ The cheapest fingering of a normalized ``shape``, as a tuple with a
+    finger number (or None) for each string, or None if it can't be played.
+    """
+    notes = sorted((fret, string) for string, fret in enumerate(shape) if fret)
+    if not notes:
+        return tuple(None for _ in shape)
+
+    # states: {(finger, index of its first note): (cost, fingers in note order)}
+    states = dict(
+        ((finger, 0), (finger - 1, (finger,)))
+        for finger in range(1, FINGERS + 1)
+    )
+
+    for index in range(1, len(notes)):
+        fret, string = notes[index]
+        previous_fret = notes[index - 1][0]
+        distance = fret - previous_fret
+
+        next_states = {}
+        for (finger, start), (cost, assigned) in states.items():
+            candidates = []
+
+            # Stay down across this note too, as a barre.
+            if not distance and can_barre(shape, fret, notes[start][1], string):
+                extra = BARRE_COST[finger] if start == index - 1 else 0
+                candidates.append((finger, start, cost + extra))
+
+            # Or move on to a higher finger, at most one fret's stretch
+            # further than the fingers in between would cover.
+            for next_finger in range(finger + 1, FINGERS + 1):
+                step = next_finger - finger
+                if distance > step + 1:
+                    continue
+                extra = step - 1 if not distance else abs(step - distance)
+                candidates.append((next_finger, index, cost + extra))
+
+            for next_finger, next_start, next_cost in candidates:
+                key = (next_finger, next_start)
+                solution = (next_cost, assigned + (next_finger,))
+                if key not in next_states or solution < next_states[key]:
+                    next_states[key] = solution
+
+        states = next_states
+        if not states:
+            return None
+
+    _, assigned = min(states.values())
+    fingers = [None] * len(shape)
+    for (_, string), finger in zip(notes, assigned):
+        fingers[string] = finger
+    return tuple(fingers)
+
+
+def fingering(positions):
+    """ A fingers string for ``positions`` (a positions string or a sequence
+    of frets, None for muted strings), with ``'-'`` for strings that aren't
+    fretted, ready to pass to `Chord`. Returns None for shapes that can't be
+    played with four fingers.
+    """
+    if isinstance(positions, str):
+        positions = parse_positions(positions)
+
+    shape = normalize(positions)
+    try:
+        fingers = _solutions[shape]
+    except KeyError:
+        fingers = solve(shape)
+        if fingers is not None:
+            fingers = ''.join('-' if finger is None else str(finger) for finger in fingers)
+        if len(_solutions) >= MAX_SOLUTIONS:
+            _solutions.clear()
+        _solutions[shape] = fingers
+    return fingers
+
+
+def fingerings(shapes):
+    """ `fingering()` for each of ``shapes``. """
+    return [fingering(positions) for positions in shapes]
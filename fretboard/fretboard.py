@@ -1,93 +1,393 @@
-import copy
-
-import attrdict
-import svgwrite
-import yaml
-
-from .compat import StringIO
-from .utils import dict_merge
+import collections
+from io import StringIO
+
+from .backends import backend_key, get_backend, iter_chunks
+from .cache import render_cache, skeleton_cache
+from .geometry import Geometry
+from .instruments import InstrumentDefault, get_instrument
+from .scales import DEGREES, find_notes, get_scale
+from .stats import RenderRecord, phase, timed_chunks
+from .style import make_style, merge_style
+from .theory import note_name, parse_chord_name, parse_note
+from .utils import freeze, open_output, write_chunks
 
 # fretboard = Fretboard(strings=6, frets=(3, 8))
 # fretboard.add_string_label(string=1, label='X', color='')
 # fretboard.add_barre(fret=1, strings=(0, 5), label='')
 # fretboard.add_marker(fret=1, string=1, label='', color='')
 
-DEFAULT_STYLE = '''
-drawing:
-    background_color: white
-    font_color: dimgray
-    font_family: Lato
-    font_size: 15
-    height: 300
-    width: 250
-    spacing: 30
-    orientation: portrait
-
-nut:
-    color: darkslategray
-    size: 10
-
-fret:
-    color: darkgray
-    size: 2
-
-inlays:
-    color: black
-    radius: 2
-
-string:
-    color: darkslategray
-    size: 3
-
-marker:
-    border_color: darkslategray
-    color: steelblue
-    font_color: white
-    radius: 12
-    stroke_width: 2
-
-'''
+DEFAULT_STYLE = {
+    'drawing': {
+        'background_color': 'white',
+        'font_color': 'dimgray',
+        'font_family': 'Lato',
+        'font_size': 15,
+        'height': 300,
+        'width': 250,
+        'spacing': 30,
+        'orientation': 'portrait',
+    },
+    'nut': {
+        'color': 'darkslategray',
+        'size': 10,
+    },
+    'fret': {
+        'color': 'darkgray',
+        'size': 2,
+    },
+    'inlays': {
+        'color': 'black',
+        'radius': 2,
+    },
+    'string': {
+        'color': 'darkslategray',
+        'size': 3,
+    },
+    'marker': {
+        'border_color': 'darkslategray',
+        'color': 'steelblue',
+        'font_color': 'white',
+        'radius': 12,
+        'root_color': 'salmon',
+        'stroke_width': 2,
+    },
+}
+
+
+class Record(object):
+    # Small mutable records. __slots__ keeps them compact, which matters when
+    # a full-neck diagram carries hundreds of markers.
+    __slots__ = ()
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, ', '.join(
+            '{0}={1!r}'.format(name, getattr(self, name)) for name in self.__slots__
+        ))
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.astuple() == other.astuple()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def astuple(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+
+class String(Record):
+    __slots__ = ('color', 'label', 'font_color')
+
+    def __init__(self, color=None, label=None, font_color=None):
+        self.color = color
+        self.label = label
+        self.font_color = font_color
+
+
+class Marker(Record):
+    __slots__ = ('string', 'fret', 'color', 'label', 'font_color')
+
+    def __init__(self, string, fret, color=None, label=None, font_color=None):
+        self.string = string
+        self.fret = fret
+        self.color = color
+        self.label = label
+        self.font_color = font_color
+
+
+class Layout(Record):
+    __slots__ = ('x', 'y', 'width', 'height', 'string_space', 'fret_space')
+
+    def __init__(self, x, y, width, height, string_space=None, fret_space=None):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.string_space = string_space
+        self.fret_space = fret_space
+
+
+# An immutable snapshot of everything that determines how a Fretboard renders.
+# Part of every `Fretboard.render_key()`. Bump it whenever a change to the
+# drawing code changes the output for the same diagram.
+RENDER_KEY_VERSION = 1
+
+Diagram = collections.namedtuple('Diagram', ('cls', 'strings', 'frets', 'inlays', 'markers', 'style'))
+
+
+# Attributes that may be set on a Fretboard instance to change how it's drawn
+# or reported, without being part of its `Diagram`.
+INSTANCE_HOOKS = ('stats', 'skeleton_cache', 'geometry')
+
+
+def render_diagram(diagram, backend=None, record=None):
+    """ Render a `Diagram` to an SVG string.
+
+    Drawing happens on a private Fretboard built from the snapshot, so any
+    number of threads can render the same diagram at once, and the element
+    tree is released as soon as the document has been serialized.
+    """
+    return diagram.cls.from_diagram(diagram).draw_svg(backend, record)
+
+
+def render_cached(diagram, output=None, backend=None):
+    """ The body of `Fretboard.render()` and `Chord.render()`: write
+    ``diagram``'s document to ``output`` (a new StringIO by default) and
+    return it, taking it from the render cache when it's there and adding it
+    when it isn't. Cache hits are reported to ``diagram.stats``; fresh
+    renders report themselves.
+    """
+    if diagram.cache is None:
+        svg = diagram.render_svg(backend)
+    else:
+        key = diagram.cache_key(backend)
+        svg = diagram.cache.get(key)
+        if svg is None:
+            svg = diagram.render_svg(backend)
+            diagram.cache.set(key, svg)
+        elif diagram.stats is not None:
+            diagram.stats(RenderRecord.from_cache(type(diagram).__name__, svg))
+
+    if output is None:
+        output = StringIO()
+
+    output.write(svg)
+    return output
+
+
+def stream_svg(diagram, backend, draw):
+    """ The body of `Fretboard.iter_svg()` and `Chord.iter_svg()`: yield
+    ``diagram``'s document from its render cache, or else draw it with
+    ``draw(backend, record)``, which returns the fretboard drawn on, and
+    serialize it chunk by chunk.
+
+    A freshly drawn document is added to the cache once it's been streamed in
+    full, unless it outgrows the cache's ``max_bytes`` on the way, in which
+    case it isn't held in memory either. Every document is reported to ``diagram.stats`` just as
+    `render()` would report it.
+    """
+    name = type(diagram).__name__
+    key = None
+    if diagram.cache is not None:
+        key = diagram.cache_key(backend)
+        svg = diagram.cache.get(key)
+        if svg is not None:
+            if diagram.stats is not None:
+                diagram.stats(RenderRecord.from_cache(name, svg))
+            yield svg
+            return
+
+    record = RenderRecord(name) if diagram.stats is not None else None
+    fretboard = draw(backend or diagram.backend, record)
+
+    chunks = iter_chunks(fretboard.drawing)
+    if record is not None:
+        chunks = timed_chunks(record, 'serialize', chunks)
+
+    # The cache won't keep a document larger than its max_bytes, so stop
+    # buffering one as soon as it's known to be too large.
+    parts = [] if key is not None else None
+    limit = getattr(diagram.cache, 'max_bytes', None)
+    size = 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if limit is not None and size > limit:
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+
+    if parts is not None:
+        diagram.cache.set(key, ''.join(parts))
+    if record is not None:
+        diagram.stats(record)
+
+
+def _column(values, count):
+    # Expand a per-marker argument of `Fretboard.add_markers()` to `count` values.
+    if values is None or isinstance(values, str):
+        return [values] * count
+    values = list(values)
+    if len(values) != count:
+        raise ValueError('Expected {0} values, got {1}'.format(count, len(values)))
+    return values
+
 
 class Fretboard(object):
-    default_style = yaml.safe_load(DEFAULT_STYLE)
+    default_style = make_style(DEFAULT_STYLE)
+
+    # Name of an entry in `instruments.INSTRUMENTS`, or an `Instrument`: the
+    # default strings, frets and inlays, and the tuning for note-aware features.
+    instrument = 'guitar'
+
+    # The instrument's inlays, unless overridden.
+    inlays = InstrumentDefault('inlays')
 
-    # Guitars and basses have different inlay patterns than, e.g., ukulele
-    # A double inlay will be added at the octave (12th fret)
-    inlays = (3, 5, 7, 9)
+    # Name of an entry in `backends.BACKENDS`, or a backend callable.
+    backend = 'svgwrite'
 
-    def __init__(self, strings=6, frets=(0, 5), inlays=None, style=None):
+    # Finished documents are cached by `cache_key()`; set to None to disable.
+    cache = render_cache
+
+    # Elements drawn by `draw_skeleton()`, cached by backend and `skeleton_key()`.
+    skeleton_cache = skeleton_cache
+
+    # Computes rows of coordinates, with NumPy for long rows when it's installed.
+    geometry = Geometry()
+
+    # Called with a `stats.RenderRecord` after every render when set, e.g. to
+    # a `stats.RenderStats`.
+    stats = None
+
+    def __init__(self, strings=None, frets=None, inlays=None, style=None, instrument=None):
+        self.instrument = get_instrument(instrument or self.instrument)
+
+        if frets is None:
+            frets = self.instrument.frets
         self.frets = list(range(max(frets[0] - 1, 0), frets[1] + 1))
-        self.strings = [attrdict.AttrDict({
-            'color': None,
-            'label': None,
-            'font_color': None,
-        }) for x in range(strings)]
+
+        if strings is None:
+            strings = self.instrument.strings
+        self.strings = [String() for x in range(strings)]
 
         self.markers = []
 
-        self.inlays = inlays if inlays is not None else self.inlays
+        if inlays is None:
+            inlays = self.inlays
+        self.inlays = inlays
 
-        self.layout = attrdict.AttrDict()
+        self.layout = None
 
-        self.style = attrdict.AttrDict(
-            dict_merge(
-                copy.deepcopy(self.default_style),
-                style or {}
-            )
-        )
+        self.style = merge_style(self.default_style, style)
 
     def add_string_label(self, string, label, font_color=None):
         self.strings[string].label = label
         self.strings[string].font_color = font_color
 
     def add_marker(self, string, fret, color=None, label=None, font_color=None):
-        self.markers.append(attrdict.AttrDict({
-            'fret': fret,
-            'string': string,
-            'color': color,
-            'label': label,
-            'font_color': font_color,
-        }))
+        self.markers.append(Marker(string, fret, color, label, font_color))
+
+    def add_markers(self, strings, frets, colors=None, labels=None, font_colors=None):
+        # Bulk form of `add_marker()`. `strings` and `frets` are equal-length
+        # sequences; the rest may each be a sequence, or one value for all.
+        strings = list(strings)
+        frets = list(frets)
+        count = len(strings)
+        if len(frets) != count:
+            raise ValueError('Expected {0} frets, got {1}'.format(count, len(frets)))
+
+        self.markers.extend(map(
+            Marker,
+            strings,
+            frets,
+            _column(colors, count),
+            _column(labels, count),
+            _column(font_colors, count),
+        ))
+
+    def add_notes(self, root, intervals, frets=None, labels='note', color=None, root_color=None):
+        """ Mark every position, across all strings, of the notes
+        ``intervals`` semitones above ``root`` (a note name), using the
+        instrument's tuning. Roots are colored ``root_color`` (by default the
+        style's ``marker.root_color``).
+
+        :param frets: ``(first, last)`` frets to cover; defaults to the frets
+            shown, including open strings when the neck starts at the nut
+        :param labels: ``'note'`` for note names, ``'degree'`` for scale
+            degrees (``'1'``, ``'b3'``, ...) or None
+        """
+        if len(self.strings) != self.instrument.strings:
+            raise ValueError('{0} has {1} strings, but this fretboard has {2}'.format(
+                self.instrument.name, self.instrument.strings, len(self.strings)))
+
+        if frets is None:
+            first_fret = self.frets[0] + 1 if self.frets[0] else 0
+            frets = (first_fret, self.frets[-1])
+        if root_color is None:
+            root_color = self.style.marker.root_color
+
+        notes = find_notes(root, intervals, self.instrument.pitches, frets[0], frets[1])
+        root = parse_note(root)
+
+        if labels == 'note':
+            labels = [note_name(root + interval) for _, _, interval in notes]
+        elif labels == 'degree':
+            labels = [DEGREES[interval] for _, _, interval in notes]
+        elif labels is not None:
+            raise ValueError('Unknown labels: {0!r}'.format(labels))
+
+        self.add_markers(
+            strings=[string for string, _, _ in notes],
+            frets=[fret for _, fret, _ in notes],
+            colors=[root_color if interval == 0 else color for _, _, interval in notes],
+            labels=labels,
+        )
+
+    def add_scale(self, root, scale='major', **options):
+        """ Mark ``scale`` (a name in `scales.SCALES`, or a list of
+        intervals) from ``root``; see `add_notes()` for the options.
+
+            fb.add_scale('A', 'minor-pentatonic', frets=(5, 8))
+        """
+        self.add_notes(root, get_scale(scale), **options)
+
+    def add_arpeggio(self, chord, **options):
+        """ Mark the notes of ``chord``, a chord name like ``'Am7'``; see
+        `add_notes()` for the options.
+        """
+        root, _, intervals, _ = parse_chord_name(chord)
+        self.add_notes(note_name(root), intervals, **options)
+
+    def diagram(self):
+        return Diagram(
+            cls=type(self),
+            strings=tuple(string.astuple() for string in self.strings),
+            frets=tuple(self.frets),
+            inlays=tuple(self.inlays),
+            markers=tuple(freeze(marker.astuple()) for marker in self.markers),
+            style=self.style,
+        )
+
+    @classmethod
+    def from_diagram(cls, diagram):
+        fretboard = cls(strings=len(diagram.strings), inlays=diagram.inlays, style=diagram.style)
+        fretboard.frets = list(diagram.frets)
+        fretboard.strings = [String(*string) for string in diagram.strings]
+        fretboard.markers = [Marker(*marker) for marker in diagram.markers]
+        return fretboard
+
+    def private_copy(self):
+        # A fretboard to draw on without touching this one. The snapshot only
+        # covers the diagram, so hooks set on this instance rather than the
+        # class are carried over by hand.
+        fretboard = type(self).from_diagram(self.diagram())
+        for name in INSTANCE_HOOKS:
+            if name in vars(self):
+                setattr(fretboard, name, getattr(self, name))
+        return fretboard
+
+    def cache_key(self, backend=None):
+        return (backend or self.backend, self.diagram())
+
+    def render_key(self, backend=None):
+        """ A digest of everything that goes into the rendered document:
+        strings, frets, inlays, markers, the effective style and the backend.
+        It's stable across processes, changes whenever the output would, and
+        costs nothing like a render, so it can serve as an ETag up front.
+        Backends given as callables are keyed as described in
+        `backends.backend_key()`, which rejects those it can't tell apart.
+        """
+        backend = backend_key(backend or self.backend)
+
+        # Every part of a diagram has a repr that's the same from one process
+        # to the next: records are plain tuples, Style fields are sorted by
+        # name whatever order they were given in, and classes print by name.
+        import hashlib
+
+        key = repr((RENDER_KEY_VERSION, backend, self.diagram()))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
 
     def calculate_layout(self):
         if self.style.drawing.orientation == 'portrait':
@@ -108,18 +408,18 @@ class Fretboard(object):
             layout_y = self.style.drawing.spacing
 
         # Bounding box of our fretboard
-        self.layout.update({
-            'x': layout_x,
-            'y': layout_y,
-            'width': layout_width,
-            'height': layout_height,
-        })
+        self.layout = Layout(
+            x=layout_x,
+            y=layout_y,
+            width=layout_width,
+            height=layout_height,
+        )
 
         # Spacing between the strings
-        self.layout['string_space'] = neck_width / (len(self.strings) - 1)
+        self.layout.string_space = neck_width / (len(self.strings) - 1)
 
         # Spacing between the frets, with room at the top and bottom for the nut
-        self.layout['fret_space'] = (neck_length - self.style.nut.size * 2) / (len(self.frets) - 1)
+        self.layout.fret_space = (neck_length - self.style.nut.size * 2) / (len(self.frets) - 1)
 
     def get_layout_string_index(self, string_index):
         if self.style.drawing.orientation == 'portrait':
@@ -128,78 +428,106 @@ class Fretboard(object):
             return len(self.strings) - string_index - 1
 
     def draw_frets(self):
-        for index, fret in enumerate(self.frets):
-            if index == 0 and self.frets[0] == 0:
-                # The first fret is the nut, don't draw it.
-                continue
-            else:
-                if self.style.drawing.orientation == 'portrait':
-                    top = self.layout.y + self.style.nut.size
-                    fret_y = top + (self.layout.fret_space * index)
-                    start = (self.layout.x, fret_y)
-                    end=(self.layout.x + self.layout.width, fret_y)
-                else:
-                    left = self.layout.x + self.style.nut.size
-                    fret_x = left + (self.layout.fret_space * index)
-                    start=(fret_x, self.layout.y)
-                    end=(fret_x, self.layout.y + self.layout.height)
+        # The first fret is the nut, don't draw it.
+        indices = [
+            index for index in range(len(self.frets))
+            if index > 0 or self.frets[0] != 0
+        ]
+        fret_space = self.layout.fret_space
 
-                self.drawing.add(
-                    self.drawing.line(
-                        start=start,
-                        end=end,
-                        stroke=self.style.fret.color,
-                        stroke_width=self.style.fret.size,
-                    )
+        if self.style.drawing.orientation == 'portrait':
+            top = self.layout.y + self.style.nut.size
+            lines = [
+                ((self.layout.x, fret_y), (self.layout.x + self.layout.width, fret_y))
+                for fret_y in self.geometry.map(lambda index: top + (fret_space * index), indices)
+            ]
+        else:
+            left = self.layout.x + self.style.nut.size
+            lines = [
+                ((fret_x, self.layout.y), (fret_x, self.layout.y + self.layout.height))
+                for fret_x in self.geometry.map(lambda index: left + (fret_space * index), indices)
+            ]
+
+        for start, end in lines:
+            self.drawing.add(
+                self.drawing.line(
+                    start=start,
+                    end=end,
+                    stroke=self.style.fret.color,
+                    stroke_width=self.style.fret.size,
                 )
+            )
 
-    def draw_strings(self):
-        for index, string in enumerate(self.strings):
+    def get_string_geometries(self):
+        count = len(self.strings)
+        size = self.style.string.size
+        string_space = self.layout.string_space
+        portrait = self.style.drawing.orientation == 'portrait'
+
+        widths = self.geometry.map(lambda index: size - ((size * 1 / (count * 1.5)) * index), range(count))
+        str_indices = [self.get_layout_string_index(index) for index in range(count)]
+        origin = self.layout.x if portrait else self.layout.y
+        positions = self.geometry.map(lambda str_index: origin + (string_space * str_index), str_indices)
 
+        geometries = []
+        for string_width, str_index, position in zip(widths, str_indices, positions):
             # Offset the first and last strings, so they're not drawn outside the edge of the nut.
-            string_width = self.style.string.size - ((self.style.string.size * 1 / (len(self.strings) * 1.5)) * index)
             offset = 0
-            str_index = self.get_layout_string_index(index)
-
             if str_index == 0:
                 offset += string_width / 2.
-            elif str_index == len(self.strings) - 1:
+            elif str_index == count - 1:
                 offset -= string_width / 2.
 
-            if self.style.drawing.orientation == 'portrait':
-                label_x = self.layout.x + (self.layout.string_space * str_index) + offset
+            if portrait:
+                label_x = position + offset
                 label_y = self.layout.y + self.style.drawing.font_size - self.style.drawing.spacing
                 string_start = (label_x, self.layout.y)
                 string_stop = (label_x, self.layout.y + self.layout.height)
-
-            elif self.style.drawing.orientation == 'landscape':
+            else:
                 label_x = self.layout.x + self.style.drawing.font_size - self.style.drawing.spacing
-                label_y = self.layout.y + (self.layout.string_space * str_index) + offset
+                label_y = position + offset
                 string_start = (self.layout.x, label_y)
                 string_stop = (self.layout.x + self.layout.width, label_y)
 
-            self.drawing.add(
-                self.drawing.line(
-                    start=string_start,
-                    end=string_stop,
-                    stroke=string.color or self.style.string.color,
-                    stroke_width=string_width
-                )
+            geometries.append((string_width, string_start, string_stop, (label_x, label_y)))
+        return geometries
+
+    def draw_strings(self):
+        for string, geometry in zip(self.strings, self.get_string_geometries()):
+            self.draw_string(string, geometry)
+
+    def draw_string(self, string, geometry):
+        string_width, string_start, string_stop, _ = geometry
+        self.drawing.add(
+            self.drawing.line(
+                start=string_start,
+                end=string_stop,
+                stroke=string.color or self.style.string.color,
+                stroke_width=string_width
             )
+        )
 
-            # Draw the label obove the string
-            if string.label is not None:
-                self.drawing.add(
-                    self.drawing.text(string.label,
-                        insert=(label_x, label_y),
-                        font_family=self.style.drawing.font_family,
-                        font_size=self.style.drawing.font_size,
-                        font_weight='bold',
-                        fill=string.font_color or self.style.marker.color,
-                        text_anchor='middle',
-                        alignment_baseline='middle',
-                    )
+    def draw_string_labels(self):
+        if all(string.label is None for string in self.strings):
+            return
+
+        for string, geometry in zip(self.strings, self.get_string_geometries()):
+            self.draw_string_label(string, geometry)
+
+    def draw_string_label(self, string, geometry):
+        # Draw the label obove the string
+        if string.label is not None:
+            self.drawing.add(
+                self.drawing.text(string.label,
+                    insert=geometry[3],
+                    font_family=self.style.drawing.font_family,
+                    font_size=self.style.drawing.font_size,
+                    font_weight='bold',
+                    fill=string.font_color or self.style.marker.color,
+                    text_anchor='middle',
+                    alignment_baseline='middle',
                 )
+            )
 
     def draw_nut(self):
         if self.style.drawing.orientation == 'portrait':
@@ -222,13 +550,14 @@ class Fretboard(object):
             )
 
     def draw_inlays(self):
+        nut_size = self.style.nut.size
+        fret_space = self.layout.fret_space
+        inlay_dists = self.geometry.map(
+            lambda index: nut_size + fret_space * index - fret_space / 2,
+            range(1, len(self.frets)),
+        )
 
-        for index, fret in enumerate(self.frets):
-            if index == 0:
-                continue
-
-            inlay_dist = self.style.nut.size + self.layout.fret_space * index - self.layout.fret_space / 2
-
+        for fret, inlay_dist in zip(self.frets[1:], inlay_dists):
             if self.style.drawing.orientation == 'portrait':
                 x = self.style.drawing.spacing - (self.style.inlays.radius * 4)
                 y = self.layout.y + inlay_dist
@@ -290,37 +619,46 @@ class Fretboard(object):
                 )
             )
 
+    def get_marker_centers(self, markers):
+        first_fret = self.frets[0]
+        fret_space = self.layout.fret_space
+        string_space = self.layout.string_space
+        nut_size = self.style.nut.size
+        spacing = self.style.drawing.spacing
+        portrait = self.style.drawing.orientation == 'portrait'
+
+        origin = self.layout.y if portrait else self.layout.x
+        along = self.geometry.map(
+            lambda fret: origin + nut_size + ((fret_space * (fret - first_fret)) - (fret_space / 2)),
+            [marker.fret for marker in markers],
+        )
+        across = self.geometry.map(
+            lambda string: spacing + (string_space * string),
+            [self.get_layout_string_index(marker.string) for marker in markers],
+        )
+
+        if portrait:
+            return list(zip(across, along))
+        return list(zip(along, across))
+
     def draw_markers(self):
+        singles = [marker for marker in self.markers if not isinstance(marker.string, (list, tuple))]
+        centers = iter(self.get_marker_centers(singles))
+
         for marker in self.markers:
             if isinstance(marker.string, (list, tuple)):
                 self.draw_barre(marker)
             else:
-                self.draw_marker(marker)
+                self.draw_marker(marker, next(centers))
 
-    def draw_marker(self, marker):
+    def draw_marker(self, marker, center=None):
         # Fretted position, add the marker to the fretboard.
-        marker_string = self.get_layout_string_index(marker.string)
-
-        if self.style.drawing.orientation == 'portrait':
-            x = self.style.drawing.spacing + (self.layout.string_space * marker_string)
-            y = sum((
-                self.layout.y,
-                self.style.nut.size,
-                (self.layout.fret_space * (marker.fret - self.frets[0])) - (
-                            self.layout.fret_space / 2)
-            ))
-        else:
-            x = sum((
-                self.layout.x,
-                self.style.nut.size,
-                (self.layout.fret_space * (marker.fret - self.frets[0])) - (
-                        self.layout.fret_space / 2)
-            ))
-            y = self.style.drawing.spacing + (self.layout.string_space * marker_string)
+        if center is None:
+            center = self.get_marker_centers([marker])[0]
 
         self.drawing.add(
             self.drawing.circle(
-                center=(x, y),
+                center=center,
                 r=self.style.marker.radius,
                 fill=marker.color or self.style.marker.color,
                 stroke=self.style.marker.border_color,
@@ -332,7 +670,7 @@ class Fretboard(object):
         if marker.label is not None:
             self.drawing.add(
                 self.drawing.text(marker.label,
-                    insert=(x, y),
+                    insert=center,
                     font_family=self.style.drawing.font_family,
                     font_size=self.style.drawing.font_size,
                     font_weight='bold',
@@ -343,28 +681,13 @@ class Fretboard(object):
             )
 
     def draw_barre(self, marker):
-        marker_string_0 = self.get_layout_string_index(marker.string[0])
-        marker_string_1 = self.get_layout_string_index(marker.string[1])
+        start, end = self.get_marker_centers([
+            Marker(string=marker.string[0], fret=marker.fret),
+            Marker(string=marker.string[1], fret=marker.fret),
+        ])
 
-        if self.style.drawing.orientation == 'portrait':
-            y = sum((
-                self.layout.y,
-                self.style.nut.size,
-                (self.layout.fret_space * (marker.fret - self.frets[0])) - (
-                        self.layout.fret_space / 2)
-            ))
-            start = (self.style.drawing.spacing + (self.layout.string_space * marker_string_0), y)
-            end = (self.style.drawing.spacing + (self.layout.string_space * marker_string_1), y)
-
-        else:
-            x = sum((
-                self.layout.x,
-                self.style.nut.size,
-                (self.layout.fret_space * (marker.fret - self.frets[0])) - (
-                        self.layout.fret_space / 2)
-            ))
-            start = (x, self.style.drawing.spacing + (self.layout.string_space * marker_string_1))
-            end = (x, self.style.drawing.spacing + (self.layout.string_space * marker_string_0))
+        if self.style.drawing.orientation != 'portrait':
+            start, end = end, start
 
         # Lines don't support borders, so fake it by drawing
         # a slightly larger line behind it.
@@ -401,12 +724,7 @@ class Fretboard(object):
                 )
             )
 
-    def draw(self):
-        self.drawing = svgwrite.Drawing(size=(
-            self.style.drawing.width,
-            self.style.drawing.height,
-        ))
-
+    def draw_background(self):
         if self.style.drawing.background_color is not None:
             self.drawing.add(
                 self.drawing.rect(
@@ -419,23 +737,124 @@ class Fretboard(object):
                 )
             )
 
-        self.calculate_layout()
-        self.draw_frets()
-        self.draw_inlays()
-        self.draw_fret_label()
-        self.draw_strings()
-        self.draw_nut()
-        self.draw_markers()
+    def skeleton_key(self):
+        # Everything that affects the output of `draw_skeleton()`.
+        return (
+            type(self),
+            tuple(self.frets),
+            tuple(self.inlays),
+            tuple(string.color for string in self.strings),
+            self.style,
+        )
+
+    def draw_skeleton(self, record=None):
+        # The parts of the diagram that don't depend on markers or string labels.
+        phase(record, 'background', self.draw_background, self.drawing)
+        phase(record, 'frets', self.draw_frets, self.drawing)
+        phase(record, 'inlays', self.draw_inlays, self.drawing)
+        phase(record, 'fret_label', self.draw_fret_label, self.drawing)
+        phase(record, 'strings', self.draw_strings, self.drawing)
+        phase(record, 'nut', self.draw_nut, self.drawing)
+
+    def neck_key(self):
+        # Everything that affects the output of `draw_neck()`. Only the
+        # number of frets matters, and whether the nut is shown, so necks
+        # are shared across fret windows.
+        return (
+            type(self),
+            len(self.frets),
+            self.frets[0] == 0,
+            tuple(string.color for string in self.strings),
+            self.style,
+        )
+
+    def draw_neck(self, record=None):
+        # The skeleton, less the parts that depend on which frets are shown
+        # (see `draw_window()`).
+        phase(record, 'background', self.draw_background, self.drawing)
+        phase(record, 'frets', self.draw_frets, self.drawing)
+        phase(record, 'strings', self.draw_strings, self.drawing)
+        phase(record, 'nut', self.draw_nut, self.drawing)
+
+    def draw_window(self, record=None):
+        phase(record, 'inlays', self.draw_inlays, self.drawing)
+        phase(record, 'fret_label', self.draw_fret_label, self.drawing)
 
-    def render(self, output=None):
-        self.draw()
+    def draw_overlay(self, record=None):
+        phase(record, 'string_labels', self.draw_string_labels, self.drawing)
+        phase(record, 'markers', self.draw_markers, self.drawing)
 
-        if output is None:
-            output = StringIO()
+    def add_elements(self, elements):
+        for element in elements:
+            self.drawing.add(element)
 
-        self.drawing.write(output)
-        return output
+    def draw(self, backend=None, record=None):
+        self.drawing = get_backend(backend or self.backend)(size=(
+            self.style.drawing.width,
+            self.style.drawing.height,
+        ))
 
-    def save(self, filename):
-        with open(filename, 'w') as output:
-            self.render(output)
+        phase(record, 'layout', self.calculate_layout)
+
+        if self.skeleton_cache is None:
+            self.draw_skeleton(record)
+        else:
+            key = (backend or self.backend, self.skeleton_key())
+            skeleton = self.skeleton_cache.get(key)
+            if skeleton is None:
+                start = len(self.drawing.elements)
+                self.draw_skeleton(record)
+                self.skeleton_cache.set(key, tuple(self.drawing.elements[start:]))
+            else:
+                phase(record, 'skeleton_cached', lambda: self.add_elements(skeleton), self.drawing)
+
+        self.draw_overlay(record)
+
+    def draw_svg(self, backend=None, record=None):
+        # Draw this instance and serialize it. Unlike `render_svg()` this
+        # leaves the drawing and layout on the instance.
+        #
+        # A caller passing in `record` reports it; otherwise we do, if enabled.
+        report = record is None and self.stats is not None
+        if report:
+            record = RenderRecord(type(self).__name__)
+
+        self.draw(backend, record)
+
+        output = StringIO()
+        phase(record, 'serialize', lambda: self.drawing.write(output))
+        svg = output.getvalue()
+
+        if record is not None:
+            record.bytes = len(svg)
+        if report:
+            self.stats(record)
+        return svg
+
+    def render_svg(self, backend=None, record=None):
+        # Like `render_diagram()`, keeping this instance's hooks.
+        return self.private_copy().draw_svg(backend or self.backend, record)
+
+    def render(self, output=None, backend=None):
+        return render_cached(self, output, backend)
+
+    def iter_svg(self, backend=None):
+        """ Yield the SVG document in chunks as it's serialized, rather than
+        building it as one string. A document already in the render cache is
+        yielded whole; a freshly drawn one is added to the cache once it's
+        been streamed, and reported to `stats` like any render.
+        """
+        def draw(backend, record):
+            fretboard = self.private_copy()
+            fretboard.draw(backend, record)
+            return fretboard
+
+        return stream_svg(self, backend, draw)
+
+    def write_svg(self, fileobj, backend=None):
+        # Stream the document to a binary file object, e.g. a file or socket.
+        write_chunks(fileobj, self.iter_svg(backend))
+
+    def save(self, filename, backend=None):
+        with open_output(filename) as output:
+            self.write_svg(output, backend)
@@ -0,0 +1,47 @@
+_numpy = None
+
+
+def get_numpy():
+    # Imported on first use: numpy is optional, and slow to import.
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+class Geometry(object):
+    """ Evaluates coordinate formulas over whole rows of frets, strings or
+    markers at once.
+
+    Formulas are written as plain arithmetic on one value, so they work on a
+    Python number or, elementwise, on a NumPy array. Rows of at least
+    ``threshold`` values are evaluated as a single NumPy array operation when
+    NumPy is installed; shorter rows, where NumPy's overhead outweighs the
+    loop it saves, use a list comprehension. A ``threshold`` of ``None``
+    never uses NumPy, and ``0`` always does.
+
+    Both paths perform the same floating point operations in the same
+    order, so they produce identical coordinates.
+    """
+
+    def __init__(self, threshold=64):
+        self.threshold = threshold
+
+    def use_numpy(self, count):
+        return (
+            self.threshold is not None
+            and count >= self.threshold
+            and get_numpy() is not None
+        )
+
+    def map(self, function, values):
+        values = list(values)
+        if self.use_numpy(len(values)):
+            # tolist() hands back Python floats, which serialize the same way
+            # as the pure Python results.
+            return function(get_numpy().asarray(values, dtype=float)).tolist()
+        return [function(value) for value in values]
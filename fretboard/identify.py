@@ -0,0 +1,107 @@
+""" Name chords from their fretted positions.
+
+    identify('x32010')                         # [ChordMatch(name='C', ...)]
+    identify((None, 3, 2, 0, 1, 0))
+    identify_many(['x32010', '022100', 'xx0232'], instrument='drop-d')
+
+Every chord of every root and quality in `theory.QUALITIES` is indexed once
+by its pitch-class mask (and, for chords of four notes or more, by the mask
+without its fifth). A shape is named by turning its frets into pitches with
+the instrument's tuning, looking its mask up in the index and ranking the
+candidates against its bass note. Rankings are memoized per (mask, bass), so
+naming a library of shapes costs a few dict lookups each.
+"""
+import collections
+
+from .chord import parse_positions
+from .instruments import fret_table, get_instrument
+from .theory import QUALITIES, chord_mask, note_name
+from .voicings import is_ascending
+
+
+ChordMatch = collections.namedtuple('ChordMatch', ('name', 'root', 'quality', 'inversion'))
+
+_index = None
+_rankings = {}
+
+
+def get_index():
+    # {pitch-class mask: [(root, quality, complete), ...]}
+    global _index
+    if _index is None:
+        index = collections.defaultdict(list)
+        for root in range(12):
+            for quality, intervals in QUALITIES.items():
+                mask = chord_mask(root, intervals)
+                index[mask].append((root, quality, True))
+                if len(intervals) >= 4 and 7 in intervals:
+                    index[mask & ~(1 << ((root + 7) % 12))].append((root, quality, False))
+        _index = dict(index)
+    return _index
+
+
+def rank(mask, bass=None):
+    """ `ChordMatch`es for a set of pitch classes with ``bass`` lowest, best
+    first: complete chords before ones missing their fifth, root position
+    before inversions, then fewer notes. Without a ``bass``, inversions
+    aren't considered and ``inversion`` is None.
+    """
+    key = (mask, bass)
+    matches = _rankings.get(key)
+    if matches is not None:
+        return matches
+
+    candidates = []
+    for root, quality, complete in get_index().get(mask, ()):
+        intervals = QUALITIES[quality]
+        name = note_name(root) + quality
+        inversion = None
+        if bass is not None:
+            inversion = intervals.index((bass - root) % 12)
+            if inversion:
+                name += '/' + note_name(bass)
+        candidates.append((
+            (not complete, bool(inversion), len(intervals), inversion or 0, name),
+            ChordMatch(name, note_name(root), quality, inversion),
+        ))
+
+    matches = tuple(match for _, match in sorted(candidates))
+    return _rankings.setdefault(key, matches)
+
+
+def identify(positions, instrument='guitar', tuning=None):
+    """ Name a chord shape: ``positions`` is a positions string or a
+    sequence of frets with None for muted strings. Returns `ChordMatch`es,
+    best first, or an empty list when no known chord matches.
+    """
+    if isinstance(positions, str):
+        positions = parse_positions(positions)
+    table = fret_table(tuning) if tuning else get_instrument(instrument).pitches
+
+    mask = 0
+    bass = None
+    for row, fret in zip(table, positions):
+        if fret is not None:
+            pitch = row[fret]
+            mask |= 1 << (pitch % 12)
+            if bass is None or pitch < bass:
+                bass = pitch
+
+    if bass is None:
+        return []
+    if not is_ascending(table):
+        # Re-entrant tunings (ukulele) have no real bass string, so shapes
+        # are named without inversions.
+        return list(rank(mask))
+    return list(rank(mask, bass % 12))
+
+
+def identify_many(shapes, instrument='guitar', tuning=None):
+    """ `identify()` each of ``shapes``, returning the best `ChordMatch` for
+    each, or None where nothing matches.
+    """
+    results = []
+    for positions in shapes:
+        matches = identify(positions, instrument, tuning)
+        results.append(matches[0] if matches else None)
+    return results
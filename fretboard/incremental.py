@@ -0,0 +1,106 @@
+import collections
+from io import StringIO
+
+from . import svg
+
+
+class IncrementalRenderer(object):
+    """ Renders a Fretboard as a series of ``<g id="...">`` fragments and
+    keeps them between renders, so that after a change (a new marker, a
+    string label, a string color) only the affected fragments are drawn
+    again.
+
+    Fragments are, in document order: ``neck`` (background, frets, inlays
+    and fret label), ``string-<n>``, ``nut``, ``string-label-<n>`` and
+    ``marker-<n>``. Every string always has a label fragment, empty when it
+    has no label, so a label change is always a replacement. Anything that
+    moves the layout (style, frets, inlays, string count) redraws everything.
+
+    `patch()` brings the fragments up to date and returns the ones that
+    changed: replace the element with the same id, append it if there isn't
+    one yet, or remove it when the value is ``None``. `render()` returns the
+    whole document. Output always uses the string backend.
+    """
+
+    def __init__(self, fretboard):
+        self.fretboard = fretboard
+        self.size = None
+        self.fragments = collections.OrderedDict()
+
+    def get_parts(self, work):
+        # Yields (id, key, draw) for every fragment; `key` captures all of the
+        # fragment's inputs, so it's redrawn exactly when its key changes.
+        layout_key = (type(work), tuple(work.frets), tuple(work.inlays), len(work.strings), work.style)
+        geometries = work.get_string_geometries()
+
+        def neck():
+            work.draw_background()
+            work.draw_frets()
+            work.draw_inlays()
+            work.draw_fret_label()
+
+        yield 'neck', layout_key, neck
+
+        for index, string in enumerate(work.strings):
+            yield (
+                'string-{0}'.format(index),
+                (layout_key, string.color),
+                lambda string=string, geometry=geometries[index]: work.draw_string(string, geometry),
+            )
+
+        yield 'nut', layout_key, work.draw_nut
+
+        for index, string in enumerate(work.strings):
+            yield (
+                'string-label-{0}'.format(index),
+                (layout_key, string.label, string.font_color),
+                lambda string=string, geometry=geometries[index]: work.draw_string_label(string, geometry),
+            )
+
+        for index, marker in enumerate(work.markers):
+            if isinstance(marker.string, (list, tuple)):
+                draw = lambda marker=marker: work.draw_barre(marker)
+            else:
+                draw = lambda marker=marker: work.draw_marker(marker)
+            yield 'marker-{0}'.format(index), (layout_key, marker.astuple()), draw
+
+    def patch(self):
+        # Draw on a private copy, leaving the fretboard itself untouched.
+        work = self.fretboard.private_copy()
+        self.size = (work.style.drawing.width, work.style.drawing.height)
+        work.drawing = svg.Document(size=self.size)
+        work.calculate_layout()
+
+        changes = collections.OrderedDict()
+        fragments = collections.OrderedDict()
+
+        for fragment_id, key, draw in self.get_parts(work):
+            previous = self.fragments.get(fragment_id)
+            if previous is not None and previous[0] == key:
+                fragments[fragment_id] = previous
+                continue
+
+            work.drawing.elements = []
+            draw()
+            fragment = '<g id="{0}">{1}</g>'.format(fragment_id, ''.join(work.drawing.elements))
+            fragments[fragment_id] = (key, fragment)
+            changes[fragment_id] = fragment
+
+        for fragment_id in self.fragments:
+            if fragment_id not in fragments:
+                changes[fragment_id] = None
+
+        self.fragments = fragments
+        return changes
+
+    def render(self, output=None):
+        self.patch()
+
+        document = svg.Document(size=self.size)
+        document.elements = [fragment for _, fragment in self.fragments.values()]
+
+        if output is None:
+            output = StringIO()
+
+        document.write(output)
+        return output
@@ -0,0 +1,110 @@
+""" Instruments: string count, tuning, inlay pattern and default frets.
+
+`Fretboard` and `Chord` take an ``instrument``, by name or as an
+`Instrument`, for their defaults, and note-aware features (voicings, chord
+identification, scales) use its tuning. New instruments and tunings are added
+with `register_instrument()`::
+
+    register_instrument('nashville', ('E3', 'A3', 'D4', 'G4', 'B3', 'E4'))
+    fretboard.Chord(positions='x32010', instrument='nashville')
+
+The pitch at every string and fret is computed once per tuning, by
+`fret_table()`, and shared by everything that needs it.
+"""
+import collections
+
+from .theory import parse_note
+
+
+# Highest fret covered by `Instrument.pitches`, and the highest a chord can
+# use; frets above this are taken to be typos.
+MAX_FRET = 36
+
+# Guitars and basses have different inlays than, e.g., ukulele. A double inlay
+# is added at the octave (12th fret).
+GUITAR_INLAYS = (3, 5, 7, 9)
+UKULELE_INLAYS = (3, 5, 7, 10)
+
+_tables = {}
+
+
+def fret_table(tuning, frets=MAX_FRET):
+    """ The MIDI pitch at each fret (0 to ``frets``) of each string of
+    ``tuning``, as a tuple of rows. Computed once per tuning and shared.
+    """
+    key = (tuple(tuning), frets)
+    table = _tables.get(key)
+    if table is None:
+        table = tuple(
+            tuple(pitch + fret for fret in range(frets + 1))
+            for pitch in map(parse_note, tuning)
+        )
+        table = _tables.setdefault(key, table)
+    return table
+
+
+class Instrument(collections.namedtuple('Instrument', ('name', 'tuning', 'inlays', 'frets'))):
+    """ A registered instrument. ``tuning`` lists the open-string notes,
+    lowest string first, and ``frets`` is the default range of frets a
+    `Fretboard` shows.
+    """
+    __slots__ = ()
+
+    @property
+    def strings(self):
+        return len(self.tuning)
+
+    @property
+    def pitches(self):
+        # Shared; see `fret_table()`.
+        return fret_table(self.tuning)
+
+
+class InstrumentDefault(object):
+    """ A class attribute that reads a field of the class's (or instance's)
+    ``instrument``, so e.g. ``Chord.strings`` is 6 and ``BassChord.strings``
+    is 4. Subclasses and instances can still set a plain value over it.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, owner):
+        instrument = (owner if instance is None else instance).instrument
+        return getattr(get_instrument(instrument), self.field)
+
+
+INSTRUMENTS = {}
+
+
+def register_instrument(name, tuning, inlays=GUITAR_INLAYS, frets=(0, 5)):
+    """ Add (or replace) the instrument ``name`` and return it. """
+    for note in tuning:
+        parse_note(note)
+    instrument = Instrument(name, tuple(tuning), tuple(inlays), tuple(frets))
+    INSTRUMENTS[name] = instrument
+    return instrument
+
+
+def get_instrument(instrument):
+    if isinstance(instrument, Instrument):
+        return instrument
+    try:
+        return INSTRUMENTS[instrument]
+    except KeyError:
+        raise ValueError('Unknown instrument: {0!r}'.format(instrument))
+
+
+register_instrument('guitar', ('E2', 'A2', 'D3', 'G3', 'B3', 'E4'))
+register_instrument('guitar-7', ('B1', 'E2', 'A2', 'D3', 'G3', 'B3', 'E4'))
+register_instrument('guitar-8', ('F#1', 'B1', 'E2', 'A2', 'D3', 'G3', 'B3', 'E4'))
+register_instrument('drop-d', ('D2', 'A2', 'D3', 'G3', 'B3', 'E4'))
+register_instrument('open-d', ('D2', 'A2', 'D3', 'F#3', 'A3', 'D4'))
+register_instrument('open-g', ('D2', 'G2', 'D3', 'G3', 'B3', 'D4'))
+register_instrument('dadgad', ('D2', 'A2', 'D3', 'G3', 'A3', 'D4'))
+register_instrument('bass', ('E1', 'A1', 'D2', 'G2'))
+register_instrument('bass-5', ('B0', 'E1', 'A1', 'D2', 'G2'))
+# Re-entrant: the G string is tuned above the C.
+register_instrument('ukulele', ('G4', 'C4', 'E4', 'A4'), inlays=UKULELE_INLAYS)
+register_instrument('baritone-ukulele', ('D3', 'G3', 'B3', 'E4'), inlays=UKULELE_INLAYS)
+register_instrument('mandolin', ('G3', 'D4', 'A4', 'E5'), inlays=UKULELE_INLAYS)
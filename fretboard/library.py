@@ -0,0 +1,354 @@
+""" Chord libraries: large collections of chord shapes kept in files.
+
+`iter_library()` and `read_library()` stream a CSV or JSONL library, parsing
+and validating each line into a `ChordSpec` without building `Chord` objects.
+`write_index()` stores specs in a compact binary index, and `ChordIndex` looks
+chords up in one by name or by shape through ``mmap``, decoding only the
+records it returns.
+
+CSV libraries have a header row; JSONL libraries have one object per line.
+Both use the fields ``name``, ``positions``, ``fingers`` (optional) and
+``instrument`` (optional, a name registered in `instruments.INSTRUMENTS`,
+default ``'guitar'``)::
+
+    name,positions,fingers
+    D,xx0232,---132
+    F#,x-15-14-11-12-11,-43121
+"""
+import collections
+import csv
+import json
+import mmap
+import os
+import struct
+
+from .chord import Chord, format_positions, parse_positions
+from .instruments import INSTRUMENTS, MAX_FRET
+from .utils import write_atomic
+
+
+# Instruments with more strings than this can't be stored in an index.
+MAX_STRINGS = 12
+
+# Characters a fingers string may use: a finger number, or '-'/'x' for none.
+FINGER_CHARS = frozenset('0123456789-xX')
+
+FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+ParseResult = collections.namedtuple('ParseResult', ('line', 'spec', 'error'))
+
+
+class ChordSpec(collections.namedtuple('ChordSpec', ('name', 'instrument', 'positions', 'fingers'))):
+    """ A validated library entry. ``positions`` is a tuple of frets, with
+    None for muted strings, and ``fingers`` a string (possibly empty).
+    """
+    __slots__ = ()
+
+    def chord(self, style=None):
+        return Chord(
+            positions=format_positions(self.positions),
+            fingers=self.fingers,
+            style=style,
+            instrument=self.instrument,
+        )
+
+
+class LibraryError(ValueError):
+    def __init__(self, message, line=None):
+        if line is not None:
+            message = 'line {0}: {1}'.format(line, message)
+        super(LibraryError, self).__init__(message)
+        self.line = line
+
+
+def parse_spec(record):
+    """ Validate one library record (a mapping of field names to strings) and
+    return it as a `ChordSpec`. Raises ValueError describing the problem.
+    """
+    name = record.get('name')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError('missing name')
+
+    instrument = record.get('instrument') or 'guitar'
+    if instrument not in INSTRUMENTS:
+        raise ValueError('unknown instrument {0!r}'.format(instrument))
+    strings = INSTRUMENTS[instrument].strings
+
+    raw = record.get('positions')
+    if not isinstance(raw, str) or not raw:
+        raise ValueError('missing positions')
+    for token in (raw.split('-') if '-' in raw else raw):
+        if not (token.isdigit() and token.isascii() or token in ('x', 'X')):
+            raise ValueError('invalid position {0!r} in {1!r}'.format(token, raw))
+
+    positions = tuple(parse_positions(raw))
+    if len(positions) != strings:
+        raise ValueError('{0} chords have {1} positions, got {2} in {3!r}'.format(
+            instrument, strings, len(positions), raw))
+
+    frets = [fret for fret in positions if fret is not None]
+    if not frets:
+        raise ValueError('every string is muted')
+    if max(frets) > MAX_FRET:
+        raise ValueError('fret {0} is out of range'.format(max(frets)))
+
+    fingers = record.get('fingers') or ''
+    if not isinstance(fingers, str):
+        raise ValueError('fingers must be a string')
+    if fingers and len(fingers) != strings:
+        raise ValueError('{0} chords have {1} fingers, got {2} in {3!r}'.format(
+            instrument, strings, len(fingers), fingers))
+    for finger in fingers:
+        if finger not in FINGER_CHARS:
+            raise ValueError('invalid finger {0!r} in {1!r}'.format(finger, fingers))
+
+    return ChordSpec(name.strip(), instrument, positions, fingers)
+
+
+def iter_records(fileobj, format='csv'):
+    # Yield (line number, record, error) for each entry of a library file.
+    if format == 'csv':
+        reader = csv.DictReader(fileobj)
+        if reader.fieldnames is None or not {'name', 'positions'} <= set(reader.fieldnames):
+            raise LibraryError('CSV libraries need a header with name and positions columns')
+        for record in reader:
+            yield reader.line_num, record, None
+
+    elif format == 'jsonl':
+        for line, text in enumerate(fileobj, 1):
+            text = text.strip()
+            if not text:
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as e:
+                yield line, None, 'invalid JSON: {0}'.format(e)
+                continue
+            if not isinstance(record, dict):
+                yield line, None, 'expected an object'
+                continue
+            yield line, record, None
+
+    else:
+        raise ValueError('Unknown library format: {0!r}'.format(format))
+
+
+def iter_library(fileobj, format='csv'):
+    """ Parse a library from the text file object ``fileobj``, yielding a
+    `ParseResult` for each entry, in order. An invalid entry doesn't stop the
+    parse; its result has no ``spec`` and ``error`` describes the problem.
+    """
+    for line, record, error in iter_records(fileobj, format):
+        if error is None:
+            try:
+                yield ParseResult(line, parse_spec(record), None)
+                continue
+            except ValueError as e:
+                error = str(e)
+        yield ParseResult(line, None, error)
+
+
+def get_format(filename):
+    try:
+        return FORMATS[os.path.splitext(filename)[1].lower()]
+    except KeyError:
+        raise ValueError('Unknown library format for {0!r}; pass format='.format(filename))
+
+
+def read_library(filename, format=None):
+    """ Yield the `ChordSpec` for each entry of the library ``filename``,
+    raising `LibraryError` (with the line number) at the first invalid one.
+    The format defaults to the one implied by the file extension.
+    """
+    with open(filename, newline='', encoding='utf-8') as fileobj:
+        for line, spec, error in iter_library(fileobj, format or get_format(filename)):
+            if error is not None:
+                raise LibraryError(error, line)
+            yield spec
+
+
+# Index layout, all little-endian:
+#
+#   header     magic, entry count, then the offset of each section below
+#   records    one RECORD per entry, in library order
+#   by name    entry numbers (uint32), sorted by name
+#   by shape   entry numbers (uint32), sorted by shape key
+#   instruments  JSON list of instrument names, indexed by RECORD.instrument
+#   names      UTF-8 names, concatenated
+#
+# A record is the name's offset and length in the names section, the
+# instrument and string count, then one byte per string for frets (MUTED for
+# muted strings) and fingers, zero-padded to MAX_STRINGS.
+MAGIC = b'FBCHIDX1'
+HEADER = struct.Struct('<8sIIIIII')
+RECORD = struct.Struct('<IHBB{0}s{0}s'.format(MAX_STRINGS))
+ENTRY = struct.Struct('<I')
+MUTED = 255
+
+
+def shape_key(instrument, positions):
+    frets = bytes(MUTED if fret is None else fret for fret in positions)
+    return struct.pack('<BB', instrument, len(positions)) + frets.ljust(MAX_STRINGS, b'\0')
+
+
+def write_index(specs, filename):
+    """ Write ``specs`` (e.g. from `read_library()`) to a chord index at
+    ``filename``. The file is replaced atomically.
+    """
+    instruments = sorted(INSTRUMENTS)
+    codes = dict((instrument, code) for code, instrument in enumerate(instruments))
+
+    records = []
+    names = []
+    name_keys = []
+    shape_keys = []
+    names_size = 0
+
+    for spec in specs:
+        if len(spec.positions) > MAX_STRINGS:
+            raise ValueError('{0!r} has more than {1} strings'.format(spec.name, MAX_STRINGS))
+
+        name = spec.name.encode('utf-8')
+        fingers = spec.fingers.encode('ascii')
+        code = codes[spec.instrument]
+
+        records.append(RECORD.pack(
+            names_size,
+            len(name),
+            code,
+            len(spec.positions),
+            shape_key(code, spec.positions)[2:],
+            fingers,
+        ))
+        names.append(name)
+        names_size += len(name)
+        name_keys.append(name)
+        shape_keys.append(shape_key(code, spec.positions))
+
+    count = len(records)
+    by_name = sorted(range(count), key=name_keys.__getitem__)
+    by_shape = sorted(range(count), key=shape_keys.__getitem__)
+    instruments = json.dumps(instruments).encode('utf-8')
+
+    records_offset = HEADER.size
+    by_name_offset = records_offset + RECORD.size * count
+    by_shape_offset = by_name_offset + ENTRY.size * count
+    instruments_offset = by_shape_offset + ENTRY.size * count
+    names_offset = instruments_offset + len(instruments)
+
+    write_atomic(filename, b''.join([
+        HEADER.pack(MAGIC, count, records_offset, by_name_offset, by_shape_offset,
+                    instruments_offset, names_offset),
+        b''.join(records),
+        b''.join(ENTRY.pack(entry) for entry in by_name),
+        b''.join(ENTRY.pack(entry) for entry in by_shape),
+        instruments,
+        b''.join(names),
+    ]))
+
+
+class ChordIndex(object):
+    """ A chord index written by `write_index()`, opened through ``mmap``.
+
+    Lookups binary search the sorted tables in the mapped file and decode
+    only the entries they return, so opening even a very large index is
+    instant and costs next to no memory::
+
+        with ChordIndex('chords.idx') as index:
+            index.find('D')               # [ChordSpec(name='D', ...), ...]
+            index.find_shape('xx0232')    # the same, by shape
+    """
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as fileobj:
+            self.data = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = HEADER.unpack_from(self.data, 0)
+        if header[0] != MAGIC:
+            self.data.close()
+            raise ValueError('{0!r} is not a chord index'.format(filename))
+
+        (_, self.count, self.records_offset, self.by_name_offset, self.by_shape_offset,
+         instruments_offset, self.names_offset) = header
+        self.instruments = json.loads(
+            self.data[instruments_offset:self.names_offset].decode('utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        name_offset, name_length, code, strings, frets, fingers = self.record(index)
+        start = self.names_offset + name_offset
+        return ChordSpec(
+            self.data[start:start + name_length].decode('utf-8'),
+            self.instruments[code],
+            tuple(None if fret == MUTED else fret for fret in bytearray(frets[:strings])),
+            fingers.rstrip(b'\0').decode('ascii'),
+        )
+
+    def record(self, index):
+        return RECORD.unpack_from(self.data, self.records_offset + RECORD.size * index)
+
+    def name_key(self, index):
+        name_offset, name_length = self.record(index)[:2]
+        start = self.names_offset + name_offset
+        return self.data[start:start + name_length]
+
+    def shape_key(self, index):
+        start = self.records_offset + RECORD.size * index + 6
+        return self.data[start:start + 2 + MAX_STRINGS]
+
+    def search(self, table_offset, get_key, key):
+        # Entry numbers from the sorted table at `table_offset` whose key
+        # equals `key`.
+        def entry(position):
+            return ENTRY.unpack_from(self.data, table_offset + ENTRY.size * position)[0]
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if get_key(entry(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries = []
+        while low < self.count and get_key(entry(low)) == key:
+            entries.append(entry(low))
+            low += 1
+        return sorted(entries)
+
+    def find(self, name):
+        """ All entries named ``name``, in library order. """
+        key = name.encode('utf-8')
+        return [self[index] for index in self.search(self.by_name_offset, self.name_key, key)]
+
+    def find_shape(self, positions, instrument='guitar'):
+        """ All entries with the given shape (a positions string or sequence
+        of frets), in library order.
+        """
+        if isinstance(positions, str):
+            positions = parse_positions(positions)
+        if instrument not in self.instruments or len(positions) > MAX_STRINGS:
+            return []
+        key = shape_key(self.instruments.index(instrument), positions)
+        return [self[index] for index in self.search(self.by_shape_offset, self.shape_key, key)]
@@ -0,0 +1,65 @@
+""" Scales, and finding their notes across the neck. """
+from .theory import parse_note
+
+
+SCALES = {
+    'major': (0, 2, 4, 5, 7, 9, 11),
+    'minor': (0, 2, 3, 5, 7, 8, 10),
+    'harmonic-minor': (0, 2, 3, 5, 7, 8, 11),
+    'melodic-minor': (0, 2, 3, 5, 7, 9, 11),
+    'major-pentatonic': (0, 2, 4, 7, 9),
+    'minor-pentatonic': (0, 3, 5, 7, 10),
+    'blues': (0, 3, 5, 6, 7, 10),
+    'dorian': (0, 2, 3, 5, 7, 9, 10),
+    'phrygian': (0, 1, 3, 5, 7, 8, 10),
+    'lydian': (0, 2, 4, 6, 7, 9, 11),
+    'mixolydian': (0, 2, 4, 5, 7, 9, 10),
+    'locrian': (0, 1, 3, 5, 6, 8, 10),
+    'whole-tone': (0, 2, 4, 6, 8, 10),
+    'diminished': (0, 2, 3, 5, 6, 8, 9, 11),
+    'chromatic': tuple(range(12)),
+}
+
+ALIASES = {
+    'ionian': 'major',
+    'aeolian': 'minor',
+    'natural-minor': 'minor',
+    'pentatonic': 'minor-pentatonic',
+}
+
+# Marker labels for each interval above the root, in semitones.
+DEGREES = ('1', 'b2', '2', 'b3', '3', '4', 'b5', '5', 'b6', '6', 'b7', '7')
+
+
+def get_scale(scale):
+    """ The intervals of ``scale``: a name in `SCALES` (or `ALIASES`), or a
+    sequence of intervals, returned as is.
+    """
+    if not isinstance(scale, str):
+        return tuple(scale)
+    try:
+        return SCALES[ALIASES.get(scale, scale)]
+    except KeyError:
+        raise ValueError('Unknown scale: {0!r}'.format(scale))
+
+
+def find_notes(root, intervals, table, first_fret, last_fret):
+    """ Every position from ``first_fret`` to ``last_fret`` on the strings
+    of a pitch ``table`` (see `instruments.fret_table()`) holding a note
+    ``intervals`` above ``root``, as ``(string, fret, interval)`` in string
+    then fret order.
+
+    Each pitch class's interval is looked up in a 12-entry table, so the
+    whole neck is one pass over the pitch table.
+    """
+    root = parse_note(root) % 12
+    degrees = [None] * 12
+    for interval in intervals:
+        degrees[(root + interval) % 12] = interval % 12
+
+    return [
+        (string, fret, degrees[pitch % 12])
+        for string, row in enumerate(table)
+        for fret, pitch in enumerate(row[first_fret:last_fret + 1], first_fret)
+        if degrees[pitch % 12] is not None
+    ]
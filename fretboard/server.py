@@ -0,0 +1,270 @@
+""" A small asyncio HTTP service that renders chord diagrams on request.
+
+    python -m fretboard.server --port 8000
+
+    GET /chord/xx0232.svg
+    GET /chord/xx0232/---132.svg?orientation=landscape
+    GET /chord/x232/-132.svg?instrument=ukulele
+
+Rendering happens in a process pool, off the event loop. Responses are kept in
+an in-memory cache and carry a strong ``ETag`` (the chord's `render_key()`),
+so clients revalidating with ``If-None-Match`` get a ``304`` without the chord
+being rendered. Concurrent requests for the same diagram share a single
+render. Requires Python 3.7+.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import logging
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .cache import RenderCache
+from .chord import Chord
+from .instruments import INSTRUMENTS
+from .library import parse_spec
+
+
+ORIENTATIONS = ('portrait', 'landscape')
+
+# Bounds on the width and height query parameters.
+MIN_SIZE = 50
+MAX_SIZE = 4000
+
+REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+logger = logging.getLogger(__name__)
+
+
+class BadRequest(ValueError):
+    def __init__(self, message, status=400):
+        super(BadRequest, self).__init__(message)
+        self.status = status
+
+
+def parse_chord_request(path, query):
+    """ Turn a request path and query string into a hashable, normalized
+    ``(instrument, positions, fingers, style)`` key.
+    """
+    parts = path.split('/')
+    if len(parts) not in (3, 4) or parts[1] != 'chord' or not parts[-1].endswith('.svg'):
+        raise BadRequest('Not found', status=404)
+
+    parts[-1] = parts[-1][:-len('.svg')]
+    positions = unquote(parts[2])
+    fingers = unquote(parts[3]) if len(parts) == 4 else ''
+
+    params = dict((key, values[-1]) for key, values in parse_qs(query).items())
+
+    instrument = params.pop('instrument', 'guitar')
+    if instrument not in INSTRUMENTS:
+        raise BadRequest('Unknown instrument: {0}'.format(instrument))
+
+    drawing = []
+    orientation = params.pop('orientation', None)
+    if orientation is not None:
+        if orientation not in ORIENTATIONS:
+            raise BadRequest('Unknown orientation: {0}'.format(orientation))
+        drawing.append(('orientation', orientation))
+
+    for name in ('width', 'height'):
+        if name in params:
+            try:
+                value = int(params.pop(name))
+            except ValueError:
+                raise BadRequest('{0} must be an integer'.format(name))
+            if not MIN_SIZE <= value <= MAX_SIZE:
+                raise BadRequest('{0} must be between {1} and {2}'.format(name, MIN_SIZE, MAX_SIZE))
+            drawing.append((name, value))
+
+    if params:
+        raise BadRequest('Unknown parameters: {0}'.format(', '.join(sorted(params))))
+
+    # The same checks as a chord library entry, so a shape that doesn't fit
+    # the instrument is turned away rather than drawn wrong.
+    try:
+        spec = parse_spec({'name': positions, 'instrument': instrument, 'positions': positions, 'fingers': fingers})
+    except ValueError as e:
+        raise BadRequest('Invalid chord: {0}'.format(e))
+
+    # A chord diagram shows a window of a few frets; anything fretted past it
+    # would be drawn off the canvas.
+    last_fret = Chord(positions=positions, instrument=instrument).get_fret_range()[1]
+    highest = max(fret for fret in spec.positions if fret is not None)
+    if highest > last_fret:
+        raise BadRequest('Invalid chord: fret {0} is outside the diagram\'s frets (up to {1})'.format(
+            highest, last_fret))
+
+    return (instrument, positions, fingers, tuple(sorted(drawing)))
+
+
+def build_chord(instrument, positions, fingers, drawing):
+    style = {'drawing': dict(drawing)} if drawing else None
+    return Chord(positions=positions, fingers=fingers, style=style, instrument=instrument)
+
+
+def render_chord(instrument, positions, fingers, drawing):
+    """ Render one chord to UTF-8 SVG. Runs in a worker process. """
+    chord = build_chord(instrument, positions, fingers, drawing)
+    return chord.render(backend='string').getvalue().encode('utf-8')
+
+
+def etag_matches(etag, header):
+    if header is None:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    # Weak comparison is what If-None-Match calls for.
+    return '*' in candidates or etag in candidates or 'W/' + etag in candidates
+
+
+class RenderServer(object):
+
+    def __init__(self, workers=None, cache=None, executor=None):
+        if cache is None:
+            cache = RenderCache(max_entries=4096)
+        if executor is None:
+            executor = concurrent.futures.ProcessPoolExecutor(workers)
+
+        self.cache = cache
+        self.etags = RenderCache(max_entries=65536, max_bytes=None)
+        self.executor = executor
+        self.pending = {}
+
+    def get_etag(self, key):
+        # Computed from the request alone, so revalidation never renders.
+        etag = self.etags.get(key)
+        if etag is None:
+            etag = '"{0}"'.format(build_chord(*key).render_key('string'))
+            self.etags.set(key, etag)
+        return etag
+
+    async def get_chord(self, key):
+        body = self.cache.get(key)
+        if body is not None:
+            return body
+
+        # Coalesce concurrent requests for the same diagram into one render.
+        task = self.pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.render(key))
+            self.pending[key] = task
+        return await task
+
+    async def render(self, key):
+        loop = asyncio.get_event_loop()
+        try:
+            body = await loop.run_in_executor(self.executor, render_chord, *key)
+            self.cache.set(key, body)
+            return body
+        finally:
+            del self.pending[key]
+
+    async def respond(self, method, target, headers):
+        if method not in ('GET', 'HEAD'):
+            return 405, [('Allow', 'GET, HEAD')], b''
+
+        url = urlsplit(target)
+        try:
+            key = parse_chord_request(url.path, url.query)
+        except BadRequest as e:
+            return e.status, [('Content-Type', 'text/plain; charset=utf-8')], str(e).encode('utf-8')
+
+        try:
+            etag = self.get_etag(key)
+            response_headers = [
+                ('ETag', etag),
+                ('Cache-Control', 'public, max-age=86400'),
+            ]
+            if etag_matches(etag, headers.get('if-none-match')):
+                return 304, response_headers, b''
+
+            body = await self.get_chord(key)
+        except Exception:
+            # Requests were validated up front, so this is our failure, not
+            # the client's.
+            logger.exception('Could not render %s', target)
+            return 500, [('Content-Type', 'text/plain; charset=utf-8')], b'Could not render chord'
+
+        response_headers.append(('Content-Type', 'image/svg+xml'))
+        return 200, response_headers, body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.write(writer, 400, [], b'Malformed request line', False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                )
+
+                status, response_headers, body = await self.respond(method, target, headers)
+                if method == 'HEAD':
+                    response_headers.append(('Content-Length', str(len(body))))
+                    body = b''
+                await self.write(writer, status, response_headers, body, keep_alive)
+
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def write(self, writer, status, headers, body, keep_alive):
+        lines = ['HTTP/1.1 {0} {1}'.format(status, REASONS[status])]
+        lines.extend('{0}: {1}'.format(name, value) for name, value in headers)
+        if not any(name == 'Content-Length' for name, _ in headers):
+            lines.append('Content-Length: {0}'.format(len(body)))
+        lines.append('Connection: {0}'.format('keep-alive' if keep_alive else 'close'))
+
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8000):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve rendered chord diagrams over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='render processes (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    server = RenderServer(workers=args.workers)
+    print('Serving chord diagrams on http://{0}:{1}/chord/'.format(args.host, args.port))
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
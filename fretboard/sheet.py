@@ -0,0 +1,114 @@
+from io import StringIO
+
+from . import svg
+from .fretboard import Fretboard
+from .utils import open_output, write_chunks
+
+
+class Sheet(object):
+    """ Several diagrams laid out in a grid in a single SVG document.
+
+    The neck of each diagram (everything drawn by `Fretboard.draw_neck()`) is
+    emitted once per distinct `Fretboard.neck_key()` as a ``<symbol>``, and
+    every diagram that shares it refers to it with ``<use>``, adding only its
+    fret window's inlays and label, markers and string labels. Diagrams of
+    the same size share a neck wherever they sit on the fretboard, so e.g.
+    the twelve transpositions of a barre chord draw it once. Output is always
+    built with the string backend.
+    """
+
+    def __init__(self, diagrams=None, columns=4):
+        self.diagrams = list(diagrams or [])
+        self.columns = columns
+
+    def add(self, diagram):
+        self.diagrams.append(diagram)
+
+    def get_fretboard(self, diagram):
+        # Draw on a private fretboard, leaving the diagram itself untouched.
+        if isinstance(diagram, Fretboard):
+            return diagram.private_copy()
+        return diagram.get_fretboard()
+
+    def iter_cells(self):
+        # Yield (symbol id, symbol or None, size, overlay) for each diagram,
+        # drawing one at a time. The symbol markup comes with the first
+        # diagram to use that neck.
+        symbol_ids = {}
+        for diagram in self.diagrams:
+            fretboard = self.get_fretboard(diagram)
+            size = (fretboard.style.drawing.width, fretboard.style.drawing.height)
+
+            fretboard.drawing = svg.Document(size=size)
+            fretboard.calculate_layout()
+
+            symbol = None
+            key = fretboard.neck_key()
+            if key not in symbol_ids:
+                symbol_ids[key] = 'neck-{0}'.format(len(symbol_ids))
+                fretboard.draw_neck()
+                symbol = '<symbol{0}>{1}</symbol>'.format(
+                    svg.format_attributes({
+                        'id': symbol_ids[key],
+                        'viewBox': '0 0 {0} {1}'.format(*size),
+                    }),
+                    ''.join(fretboard.drawing.elements),
+                )
+                fretboard.drawing.elements = []
+
+            fretboard.draw_window()
+            fretboard.draw_overlay()
+            yield symbol_ids[key], symbol, size, ''.join(fretboard.drawing.elements)
+
+    def iter_svg(self):
+        """ Yield the sheet's SVG document in chunks, drawing one diagram at a
+        time, so memory use doesn't grow with the number of diagrams. Each
+        neck's ``<symbol>`` goes in a ``<defs>`` of its own, just before the
+        first diagram that uses it.
+        """
+        sizes = [(diagram.style.drawing.width, diagram.style.drawing.height) for diagram in self.diagrams]
+        cell_width = max([width for width, _ in sizes] or [0])
+        cell_height = max([height for _, height in sizes] or [0])
+
+        rows = (len(sizes) + self.columns - 1) // self.columns
+        attributes = dict(
+            svg.SVG_ATTRIBUTES,
+            width=cell_width * min(len(sizes), self.columns),
+            height=cell_height * rows,
+        )
+
+        yield svg.XML_HEADER
+        yield '<svg{0}>'.format(svg.format_attributes(attributes))
+
+        for index, (symbol_id, symbol, size, overlay) in enumerate(self.iter_cells()):
+            if symbol is not None:
+                yield '<defs>{0}</defs>'.format(symbol)
+
+            row, column = divmod(index, self.columns)
+            yield '<g transform="translate({0} {1})">{2}{3}</g>'.format(
+                column * cell_width,
+                row * cell_height,
+                svg.element('use', {
+                    'xlink:href': '#' + symbol_id,
+                    'width': size[0],
+                    'height': size[1],
+                }, {}),
+                overlay,
+            )
+
+        yield '</svg>'
+
+    def render(self, output=None):
+        if output is None:
+            output = StringIO()
+
+        for chunk in self.iter_svg():
+            output.write(chunk)
+        return output
+
+    def write_svg(self, fileobj):
+        write_chunks(fileobj, self.iter_svg())
+
+    def save(self, filename):
+        with open_output(filename) as output:
+            self.write_svg(output)
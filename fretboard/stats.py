@@ -0,0 +1,123 @@
+import threading
+import timeit
+
+
+class RenderRecord(object):
+    """ Timings for a single render: wall time and number of elements emitted
+    for each drawing phase, plus the size of the finished document.
+    """
+    __slots__ = ('diagram', 'phases', 'bytes', 'cached')
+
+    def __init__(self, diagram):
+        self.diagram = diagram
+        self.phases = []
+        self.bytes = 0
+        self.cached = False
+
+    def __repr__(self):
+        return 'RenderRecord({0!r}, phases={1!r}, bytes={2!r}, cached={3!r})'.format(
+            self.diagram, self.phases, self.bytes, self.cached,
+        )
+
+    @classmethod
+    def from_cache(cls, diagram, svg):
+        record = cls(diagram)
+        record.bytes = len(svg)
+        record.cached = True
+        return record
+
+    @property
+    def seconds(self):
+        return sum(seconds for _, seconds, _ in self.phases)
+
+    def add(self, name, seconds, elements=0):
+        self.phases.append((name, seconds, elements))
+
+
+def phase(record, name, func, drawing=None):
+    """ Call ``func``, timing it into ``record`` as phase ``name`` and counting
+    the elements it adds to ``drawing``. With no ``record`` this is just a
+    call, so instrumentation costs nothing when it's switched off.
+    """
+    if record is None:
+        return func()
+
+    before = len(drawing.elements) if drawing is not None else 0
+    start = timeit.default_timer()
+    result = func()
+    seconds = timeit.default_timer() - start
+    after = len(drawing.elements) if drawing is not None else 0
+
+    record.add(name, seconds, after - before)
+    return result
+
+
+def timed_chunks(record, name, chunks):
+    """ Yield ``chunks``, timing just the work of producing them (not what
+    the consumer does in between) into ``record`` as phase ``name``, and
+    adding their length to ``record.bytes``.
+    """
+    seconds = 0.
+    iterator = iter(chunks)
+    while True:
+        start = timeit.default_timer()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            break
+        seconds += timeit.default_timer() - start
+        record.bytes += len(chunk)
+        yield chunk
+    record.add(name, seconds)
+
+
+class RenderStats(object):
+    """ Aggregates `RenderRecord`s. Instances are callable, so one can be set
+    directly as the ``stats`` hook of `Fretboard` or `Chord`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __call__(self, record):
+        self.record(record)
+
+    def reset(self):
+        with self._lock:
+            self.renders = 0
+            self.cached = 0
+            self.bytes = 0
+            self.diagrams = {}
+            self.phases = {}
+
+    def record(self, record):
+        with self._lock:
+            self.renders += 1
+            self.bytes += record.bytes
+            self.diagrams[record.diagram] = self.diagrams.get(record.diagram, 0) + 1
+            if record.cached:
+                self.cached += 1
+
+            for name, seconds, elements in record.phases:
+                totals = self.phases.setdefault(name, {'calls': 0, 'seconds': 0.0, 'elements': 0})
+                totals['calls'] += 1
+                totals['seconds'] += seconds
+                totals['elements'] += elements
+
+    def metrics(self, prefix='fretboard'):
+        """ Flatten the totals into ``{metric name: value}``, ready to hand to
+        a metrics client as counters.
+        """
+        with self._lock:
+            metrics = {
+                prefix + '.renders': self.renders,
+                prefix + '.renders.cached': self.cached,
+                prefix + '.bytes': self.bytes,
+            }
+            for diagram, count in self.diagrams.items():
+                metrics['{0}.diagrams.{1}'.format(prefix, diagram)] = count
+            for name, totals in self.phases.items():
+                for key, value in totals.items():
+                    metrics['{0}.phases.{1}.{2}'.format(prefix, name, key)] = value
+        return metrics
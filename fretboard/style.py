@@ -0,0 +1,163 @@
+import threading
+import weakref
+from collections.abc import Mapping
+
+from .utils import dict_merge
+
+
+class Style(object):
+    """ An immutable, hashable set of style options.
+
+    Each distinct set of keys gets its own ``__slots__`` subclass, so options
+    are read with plain attribute access (``style.drawing.width``). Build
+    styles with `make_style()` and `merge_style()` rather than directly;
+    both intern their results, so equal styles are usually the same object.
+    """
+    __slots__ = ('_hash', '_repr', '__weakref__')
+    _fields = ()
+
+    def __init__(self, values):
+        for field in self._fields:
+            object.__setattr__(self, field, values[field])
+        object.__setattr__(self, '_hash', hash((self._fields, _typed(self._values()))))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Style objects are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Style objects are immutable')
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._hash == other._hash and _typed(self._values()) == _typed(other._values())
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __repr__(self):
+        # Computed once; `Fretboard.render_key()` hashes it for every call.
+        try:
+            return self._repr
+        except AttributeError:
+            pass
+        value = 'Style({0})'.format(', '.join(
+            '{0}={1!r}'.format(field, getattr(self, field)) for field in self._fields
+        ))
+        object.__setattr__(self, '_repr', value)
+        return value
+
+    def __reduce__(self):
+        return (make_style, (self._asdict(),))
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in self._fields)
+
+    def _asdict(self):
+        return dict(
+            (field, value._asdict() if isinstance(value, Style) else value)
+            for field, value in zip(self._fields, self._values())
+        )
+
+
+def _typed(value):
+    # A hashable copy of `value` that keeps the type of everything in it, so
+    # options that render differently (15 and 15.0, 1 and True, a mapping and
+    # a list of pairs) never compare equal.
+    if isinstance(value, Style):
+        return value
+    if isinstance(value, Mapping):
+        return (Mapping, tuple(sorted((key, _typed(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (tuple, tuple(_typed(item) for item in value))
+    return (type(value), value)
+
+
+_classes = {}
+_interned = weakref.WeakValueDictionary()
+_merged = {}
+_lock = threading.Lock()
+
+# Caps on the merge memo; beyond this it's cleared rather than grown.
+MAX_MERGED = 1024
+
+
+def _style_class(fields):
+    try:
+        return _classes[fields]
+    except KeyError:
+        cls = type('Style', (Style,), {'__slots__': fields, '_fields': fields})
+        return _classes.setdefault(fields, cls)
+
+
+def _compile(value):
+    if isinstance(value, Style):
+        return value
+    if isinstance(value, Mapping):
+        fields = tuple(sorted(value))
+        return _style_class(fields)(dict(
+            (field, _compile(value[field])) for field in fields
+        ))
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def make_style(mapping):
+    """ Compile a (possibly nested) mapping of style options into an interned
+    `Style`. Nested mappings become nested `Style` objects.
+    """
+    if isinstance(mapping, Style):
+        return mapping
+
+    key = _typed(mapping)
+    with _lock:
+        style = _interned.get(key)
+        if style is None:
+            style = _compile(mapping)
+            _interned[key] = style
+    return style
+
+
+def merge_style(base, overrides=None):
+    """ Recursively merge ``overrides`` (a mapping or `Style`) into the `Style`
+    ``base``, returning an interned `Style`. Results are memoized, so merging
+    the same overrides into the same base again is a dict lookup.
+    """
+    if not overrides or overrides is base:
+        return base
+
+    key = (base, _typed(overrides))
+    try:
+        return _merged[key]
+    except KeyError:
+        pass
+
+    if isinstance(overrides, Style):
+        overrides = overrides._asdict()
+    style = make_style(dict_merge(base._asdict(), overrides))
+
+    with _lock:
+        if len(_merged) >= MAX_MERGED:
+            _merged.clear()
+        _merged[key] = style
+    return style
@@ -0,0 +1,244 @@
+import collections
+
+XML_HEADER = '<?xml version="1.0" encoding="utf-8" ?>\n'
+
+SVG_ATTRIBUTES = (
+    ('baseProfile', 'full'),
+    ('version', '1.1'),
+    ('xmlns', 'http://www.w3.org/2000/svg'),
+    ('xmlns:ev', 'http://www.w3.org/2001/xml-events'),
+    ('xmlns:xlink', 'http://www.w3.org/1999/xlink'),
+)
+
+
+def attribute_name(name):
+    # Same convention as svgwrite: stroke_width -> stroke-width, class_ -> class
+    return name.rstrip('_').replace('_', '-')
+
+
+# xml.sax.saxutils would do, but importing it pulls in urllib and most of the
+# email package.
+def escape(value):
+    # Labels may be numbers; svgwrite takes anything with a str().
+    return str(value).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def quote(value):
+    value = str(value)
+    # Nearly every value is a number or a color name, skip escaping those.
+    if '&' in value or '<' in value or '>' in value or '"' in value:
+        value = escape(value).replace('"', '&quot;')
+    return '"' + value + '"'
+
+
+def format_attributes(attributes):
+    return ''.join([
+        ' ' + name + '=' + quote(value)
+        for name, value in sorted(attributes.items())
+        if value is not None
+    ])
+
+
+# Attributes `CompactDocument` moves into its stylesheet.
+PRESENTATION_ATTRIBUTES = frozenset((
+    'alignment-baseline',
+    'fill',
+    'font-family',
+    'font-size',
+    'font-style',
+    'font-weight',
+    'stroke',
+    'stroke-linecap',
+    'stroke-width',
+    'text-anchor',
+))
+
+
+# Unlike presentation attributes, CSS wants a unit on these.
+LENGTH_PROPERTIES = frozenset(('font-size', 'stroke-width'))
+
+
+def format_number(value, precision):
+    if not isinstance(value, float):
+        return value
+    value = '{0:.{1}f}'.format(value, precision)
+    if '.' in value:
+        value = value.rstrip('0').rstrip('.')
+    return '0' if value == '-0' else value
+
+
+def element(tag, attributes, extra, content=None):
+    for name, value in extra.items():
+        attributes[attribute_name(name)] = value
+
+    if content is None:
+        return '<{0}{1} />'.format(tag, format_attributes(attributes))
+    return '<{0}{1}>{2}</{0}>'.format(tag, format_attributes(attributes), escape(content))
+
+
+class Document(object):
+    """ A minimal, dependency-free stand-in for `svgwrite.Drawing`.
+
+    Supports only the elements Fretboard draws, and skips svgwrite's
+    per-attribute validation. Elements are kept as serialized strings, with
+    the same elements, attributes and values svgwrite produces for the same
+    calls. Attributes are sorted by name, which matches svgwrite 1.4's output
+    but not older releases, which keep them in insertion order.
+    """
+
+    def __init__(self, size=('100%', '100%')):
+        self.width, self.height = size
+        self.elements = []
+
+    def add(self, element):
+        self.elements.append(element)
+        return element
+
+    def element(self, tag, attributes, extra, content=None):
+        return element(tag, attributes, extra, content)
+
+    def line(self, start, end, **extra):
+        return self.element('line', {
+            'x1': start[0],
+            'y1': start[1],
+            'x2': end[0],
+            'y2': end[1],
+        }, extra)
+
+    def circle(self, center, r, **extra):
+        return self.element('circle', {
+            'cx': center[0],
+            'cy': center[1],
+            'r': r,
+        }, extra)
+
+    def rect(self, insert, size, **extra):
+        return self.element('rect', {
+            'x': insert[0],
+            'y': insert[1],
+            'width': size[0],
+            'height': size[1],
+        }, extra)
+
+    def text(self, text, insert, **extra):
+        return self.element('text', {
+            'x': insert[0],
+            'y': insert[1],
+        }, extra, content=text)
+
+    def start_tag(self):
+        attributes = dict(SVG_ATTRIBUTES, width=self.width, height=self.height)
+        return '<svg{0}><defs />'.format(format_attributes(attributes))
+
+    def tostring(self):
+        return self.start_tag() + ''.join(self.elements) + '</svg>'
+
+    def iter_chunks(self):
+        # Serialize piece by piece, without building the whole document.
+        yield XML_HEADER
+        yield self.start_tag()
+        for element in self.elements:
+            yield element
+        yield '</svg>'
+
+    def write(self, fileobj):
+        fileobj.write(XML_HEADER)
+        fileobj.write(self.tostring())
+
+
+CompactElement = collections.namedtuple('CompactElement', ('tag', 'attributes', 'style', 'content'))
+
+
+class CompactDocument(Document):
+    """ A `Document` that trades svgwrite-equivalent output for size.
+
+    Presentation attributes (colors, stroke widths, fonts) are collected into
+    a single ``<style>`` block, with one class per distinct combination,
+    numbers are rounded to ``precision`` decimal places, and the root element
+    only carries the attributes a renderer needs.
+
+    Elements are kept unserialized until they're written, when classes are
+    named in order of first use, after a digest of the document's styles so
+    that several documents inlined in one page don't restyle each other.
+    Keeping elements unserialized means they can be shared between documents
+    (e.g. by the skeleton cache) and the output is still deterministic.
+    """
+
+    def __init__(self, size=('100%', '100%'), precision=2):
+        super(CompactDocument, self).__init__(size)
+        self.precision = precision
+
+    def element(self, tag, attributes, extra, content=None):
+        style = []
+        for name, value in extra.items():
+            name = attribute_name(name)
+            if name in PRESENTATION_ATTRIBUTES:
+                if name in LENGTH_PROPERTIES and isinstance(value, (int, float)):
+                    value = '{0}px'.format(format_number(value, self.precision))
+                style.append((name, value))
+            else:
+                attributes[name] = value
+
+        attributes = dict(
+            (name, format_number(value, self.precision))
+            for name, value in attributes.items()
+        )
+        return CompactElement(tag, attributes, tuple(sorted(style)), content)
+
+    def get_classes(self):
+        # Class names, in order of first use, for each distinct style. A
+        # document's stylesheet applies to the whole page it's inlined in, so
+        # names are prefixed with a digest of the styles: documents only share
+        # a class name when they define it the same way.
+        styles = []
+        seen = set()
+        for element in self.elements:
+            if element.style and element.style not in seen:
+                seen.add(element.style)
+                styles.append(element.style)
+
+        import hashlib
+
+        prefix = 'f' + hashlib.sha1(repr(styles).encode('utf-8')).hexdigest()[:6]
+        return collections.OrderedDict(
+            (style, '{0}-{1}'.format(prefix, index))
+            for index, style in enumerate(styles)
+        )
+
+    def serialize(self, element, classes):
+        tag, attributes, style, content = element
+        if style:
+            attributes = dict(attributes, **{'class': classes[style]})
+        attributes = format_attributes(attributes)
+
+        if content is None:
+            return '<{0}{1}/>'.format(tag, attributes)
+        return '<{0}{1}>{2}</{0}>'.format(tag, attributes, escape(content))
+
+    def iter_chunks(self):
+        # The XML declaration is optional for UTF-8 documents.
+        classes = self.get_classes()
+        stylesheet = ''.join(
+            '.{0}{{{1}}}'.format(name, ';'.join('{0}:{1}'.format(*item) for item in style))
+            for style, name in classes.items()
+        )
+
+        attributes = {
+            'xmlns': 'http://www.w3.org/2000/svg',
+            'width': format_number(self.width, self.precision),
+            'height': format_number(self.height, self.precision),
+        }
+        yield '<svg{0}>{1}'.format(
+            format_attributes(attributes),
+            '<style>{0}</style>'.format(escape(stylesheet)) if stylesheet else '',
+        )
+
+        for element in self.elements:
+            yield self.serialize(element, classes)
+        yield '</svg>'
+
+    def tostring(self):
+        return ''.join(self.iter_chunks())
+
+    def write(self, fileobj):
+        fileobj.write(self.tostring())
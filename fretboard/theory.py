@@ -0,0 +1,126 @@
+""" Notes, chord qualities and pitch-class sets.
+
+Pitch classes are integers 0-11 (C = 0), and a set of them is a 12-bit mask
+with bit ``pc`` set for each member, so set operations are integer ops.
+Notes with an octave are MIDI numbers (``'E2'`` = 40, ``'C4'`` = 60).
+"""
+import re
+
+
+NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
+NATURALS = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+ACCIDENTALS = {'': 0, '#': 1, 'b': -1}
+
+# Chord qualities: the suffix after the root, and its intervals in semitones.
+QUALITIES = {
+    '': (0, 4, 7),
+    'm': (0, 3, 7),
+    'dim': (0, 3, 6),
+    'aug': (0, 4, 8),
+    'sus2': (0, 2, 7),
+    'sus4': (0, 5, 7),
+    '5': (0, 7),
+    '6': (0, 4, 7, 9),
+    'm6': (0, 3, 7, 9),
+    '7': (0, 4, 7, 10),
+    'maj7': (0, 4, 7, 11),
+    'm7': (0, 3, 7, 10),
+    'mmaj7': (0, 3, 7, 11),
+    'm7b5': (0, 3, 6, 10),
+    'dim7': (0, 3, 6, 9),
+    '7sus4': (0, 5, 7, 10),
+    'add9': (0, 2, 4, 7),
+    '9': (0, 2, 4, 7, 10),
+    'maj9': (0, 2, 4, 7, 11),
+    'm9': (0, 2, 3, 7, 10),
+}
+
+# Other common spellings of the suffixes above.
+ALIASES = {
+    'M': '',
+    'maj': '',
+    'min': 'm',
+    '-': 'm',
+    '+': 'aug',
+    'sus': 'sus4',
+    'M7': 'maj7',
+    'min7': 'm7',
+    '-7': 'm7',
+    'm(maj7)': 'mmaj7',
+    'mM7': 'mmaj7',
+    'o': 'dim',
+    'o7': 'dim7',
+    'ø': 'm7b5',
+    'ø7': 'm7b5',
+    '-7b5': 'm7b5',
+}
+
+# Qualities used when enumerating "every chord".
+COMMON_QUALITIES = ('', 'm', '7', 'maj7', 'm7', 'm7b5', 'dim', 'aug', 'sus2', 'sus4', '6', '9')
+
+NOTE_RE = re.compile(r'^([A-G])([#b]?)(-?\d+)?$')
+CHORD_RE = re.compile(r'^([A-G][#b]?)(.*?)(?:/([A-G][#b]?))?$')
+
+
+def parse_note(note):
+    """ The pitch class of a note name (``'F#'``, ``'Bb'``), or the MIDI
+    number when it has an octave (``'E2'``). Integers are returned as is.
+    """
+    if isinstance(note, int):
+        return note
+
+    match = NOTE_RE.match(note)
+    if match is None:
+        raise ValueError('Invalid note: {0!r}'.format(note))
+
+    natural, accidental, octave = match.groups()
+    pitch = NATURALS[natural] + ACCIDENTALS[accidental]
+    if octave is None:
+        return pitch % 12
+    return pitch + (int(octave) + 1) * 12
+
+
+def note_name(pitch):
+    return NOTE_NAMES[pitch % 12]
+
+
+def pitch_mask(pitches):
+    """ The pitch-class mask of an iterable of pitch classes or MIDI numbers. """
+    mask = 0
+    for pitch in pitches:
+        mask |= 1 << (pitch % 12)
+    return mask
+
+
+def transpose_mask(mask, semitones):
+    # Rotate a 12-bit pitch-class mask.
+    semitones %= 12
+    return ((mask << semitones) | (mask >> (12 - semitones))) & 0xfff
+
+
+def parse_chord_name(name):
+    """ Parse a chord name (``'Cmaj7'``, ``'F#m7b5'``, ``'D/F#'``) into
+    ``(root, suffix, intervals, bass)``: the root's pitch class, the canonical
+    quality suffix (a key of `QUALITIES`), its intervals, and the pitch class
+    of a slash-chord bass note, or None.
+    """
+    match = CHORD_RE.match(name.strip())
+    if match is None:
+        raise ValueError('Invalid chord name: {0!r}'.format(name))
+
+    root, suffix, bass = match.groups()
+    suffix = ALIASES.get(suffix, suffix)
+    if suffix not in QUALITIES:
+        raise ValueError('Unknown chord quality {0!r} in {1!r}'.format(suffix, name))
+
+    return (
+        parse_note(root),
+        suffix,
+        QUALITIES[suffix],
+        parse_note(bass) if bass else None,
+    )
+
+
+def chord_mask(root, intervals):
+    return pitch_mask(root + interval for interval in intervals)
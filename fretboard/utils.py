@@ -1,4 +1,5 @@
-import collections
+import os
+from collections.abc import Mapping
 
 
 # https://gist.github.com/angstwad/bf22d1822c38a92ec0a9
@@ -13,8 +14,94 @@ def dict_merge(dct, merge_dct):
     """
     for k, v in merge_dct.items():
         if (k in dct and isinstance(dct[k], dict)
-                and isinstance(merge_dct[k], collections.Mapping)):
+                and isinstance(merge_dct[k], Mapping)):
             dict_merge(dct[k], merge_dct[k])
         else:
             dct[k] = merge_dct[k]
     return dct
+
+
+def freeze(value):
+    """ Return a hashable copy of ``value``, suitable for use as a cache key.
+    Mappings become tuples of ``(key, value)`` pairs sorted by key, so two
+    dicts with the same contents freeze to the same value regardless of
+    insertion order. Lists and tuples are frozen element-wise.
+    :param value: the value to freeze
+    :return: a hashable equivalent of ``value``
+    """
+    if isinstance(value, Mapping):
+        return tuple(sorted(
+            ((k, freeze(v)) for k, v in value.items()),
+            key=lambda item: item[0],
+        ))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def write_atomic(filename, data):
+    """ Write ``data`` to ``filename`` so that readers only ever see the old
+    contents or the complete new contents: write a temporary file in the same
+    directory, then rename it over ``filename``.
+    :param filename: path of the file to write
+    :param data: text (written as UTF-8, like `save()`) or bytes to write
+    :return: None
+    """
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+
+    # tempfile pulls in random and shutil; don't make `import fretboard` pay.
+    import tempfile
+
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(filename)),
+        prefix='.' + os.path.basename(filename),
+        suffix='.tmp',
+    )
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            output.write(data)
+        # mkstemp creates the file private to us; make it readable like a
+        # normally created file would be.
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, filename)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def open_output(filename):
+    """ Open ``filename`` for writing an SVG document in binary mode. Files
+    ending in ``.svgz`` are gzipped, with a zero timestamp so that the same
+    document always compresses to the same bytes.
+    :param filename: path of the file to write, as a string or path object
+    :return: a writable binary file object
+    """
+    if os.fspath(filename).endswith('.svgz'):
+        import gzip
+        return gzip.GzipFile(filename, 'wb', mtime=0)
+    return open(filename, 'wb')
+
+
+def write_chunks(fileobj, chunks, buffer_size=65536, encoding='utf-8'):
+    """ Encode text ``chunks`` and write them to the binary ``fileobj``,
+    batched into writes of about ``buffer_size`` characters, so a stream of
+    small chunks doesn't turn into a write call each.
+    :param fileobj: binary file object, e.g. from ``socket.makefile('wb')``
+    :param chunks: iterable of strings
+    :param buffer_size: number of characters to collect per write
+    :param encoding: encoding for the output
+    :return: None
+    """
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            fileobj.write(''.join(buffer).encode(encoding))
+            buffer = []
+            size = 0
+
+    if buffer:
+        fileobj.write(''.join(buffer).encode(encoding))
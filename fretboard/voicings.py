@@ -0,0 +1,156 @@
+""" Enumerate playable voicings of a chord on a fretted instrument.
+
+    voicings('Cmaj7')                          # ['x32000', 'x32003', ...]
+    voicings('F#m7b5', instrument='ukulele')
+    voicings('D', tuning=('D2', 'A2', 'D3', 'G3', 'B3', 'E4'))
+
+Each string's candidate frets come from the instrument's shared table of the
+pitch at every fret. The search walks the strings from lowest to
+highest, keeping the pitch classes covered so far as a bitmask, and drops a
+partial voicing as soon as the strings left can't supply the missing chord
+tones or its frets no longer fit in the hand span.
+"""
+from .chord import format_positions
+from .instruments import fret_table, get_instrument
+from .theory import COMMON_QUALITIES, NOTE_NAMES, chord_mask, parse_chord_name
+
+
+# Weight of a muted string, in frets, when ranking voicings.
+MUTE_COST = 3
+
+
+def is_ascending(table):
+    # Whether each string of a fret table is tuned above the one before.
+    return all(low[0] < high[0] for low, high in zip(table, table[1:]))
+
+
+def voicings(name, instrument='guitar', tuning=None, span=4, max_fret=12,
+             min_strings=None, inversions=None):
+    """ Playable voicings of the chord ``name`` (see
+    `theory.parse_chord_name()`), as positions strings ready to pass to
+    `Chord`, easiest first: nearest the nut and fullest, then most compact.
+    Any string may be muted, but one muted between sounding strings (as in
+    ``'x3x453'``) ranks as harder than one at either edge.
+
+    :param instrument: name of a registered instrument, or an `Instrument`
+    :param tuning: open-string notes, lowest string first, overriding the
+        instrument's
+    :param span: most frets the fretting hand can cover
+    :param max_fret: highest fret to use
+    :param min_strings: fewest strings that must sound (default: all but
+        two, at least three)
+    :param inversions: allow a chord tone other than the root (or the bass
+        note of a slash chord) as the lowest note. Defaults to False, except
+        for re-entrant tunings, whose lowest note is rarely the root.
+    """
+    root, _, intervals, bass = parse_chord_name(name)
+    table = fret_table(tuning or get_instrument(instrument).tuning, max_fret)
+    strings = len(table)
+
+    mask = chord_mask(root, intervals)
+    required = mask
+    if len(intervals) >= 4 and 7 in intervals:
+        # The fifth is the first note dropped from a big chord.
+        required &= ~(1 << ((root + 7) % 12))
+    if bass is not None:
+        mask |= 1 << bass
+        required |= 1 << bass
+
+    # With strings in ascending pitch the first sounding string usually has
+    # the lowest note, so voicings can be pruned on it as soon as it's chosen.
+    # An open string can still sound below a fretted one, and re-entrant
+    # tunings (ukulele) don't order their strings at all, so the bass of every
+    # whole voicing is checked too.
+    ascending = is_ascending(table)
+    if inversions is None:
+        inversions = not ascending
+    lowest = None if inversions and bass is None else (root if bass is None else bass)
+
+    if min_strings is None:
+        min_strings = min(strings, max(3, strings - 2))
+    min_strings = max(min_strings, bin(required).count('1'))
+
+    # options[string]: (fret, pitch class bit) for every fret holding a chord tone
+    options = []
+    for row in table:
+        options.append([
+            (fret, 1 << (pitch % 12))
+            for fret, pitch in enumerate(row)
+            if mask & (1 << (pitch % 12))
+        ])
+
+    # reachable[string]: the pitch classes strings `string` and up can supply
+    reachable = [0] * (strings + 1)
+    for string in range(strings - 1, -1, -1):
+        reachable[string] = reachable[string + 1]
+        for _, bit in options[string]:
+            reachable[string] |= bit
+
+    results = []
+    positions = [None] * strings
+
+    def search(string, covered, low, high, sounding):
+        if (covered | reachable[string]) & required != required:
+            return
+        if sounding + strings - string < min_strings:
+            return
+
+        if string == strings:
+            fretted = [fret for fret in positions if fret]
+            # Four fingers, or a barre across the lowest fret plus three. A
+            # barre can't cross a string that's muted or played open.
+            if len(fretted) > 4:
+                barred = [index for index, fret in enumerate(positions) if fret == low]
+                if sum(1 for fret in fretted if fret > low) > 3:
+                    return
+                if not all(positions[barred[0]:barred[-1] + 1]):
+                    return
+            if lowest is not None:
+                bass_pitch = min(row[fret] for row, fret in zip(table, positions) if fret is not None)
+                if bass_pitch % 12 != lowest:
+                    return
+            results.append(tuple(positions))
+            return
+
+        positions[string] = None
+        search(string + 1, covered, low, high, sounding)
+
+        for fret, bit in options[string]:
+            if not sounding and ascending and lowest is not None and bit != 1 << lowest:
+                continue
+            if fret:
+                new_low = min(low, fret)
+                new_high = max(high, fret)
+                if new_high - new_low >= span:
+                    continue
+            else:
+                new_low, new_high = low, high
+            positions[string] = fret
+            search(string + 1, covered | bit, new_low, new_high, sounding + 1)
+        positions[string] = None
+
+    search(0, 0, max_fret + 1, 0, 0)
+
+    def difficulty(positions):
+        # How far up the neck the hand reaches, with each muted string
+        # counting as a few frets' worth of awkwardness (twice that between
+        # sounding strings, where a finger has to damp it), then the stretch.
+        fretted = [fret for fret in positions if fret] or [0]
+        muted = positions.count(None)
+        sounding = [index for index, fret in enumerate(positions) if fret is not None]
+        interior = positions[sounding[0]:sounding[-1] + 1].count(None)
+        return (max(fretted) + MUTE_COST * (muted + interior), muted, max(fretted) - min(fretted))
+
+    results.sort(key=difficulty)
+    return [format_positions(positions) for positions in results]
+
+
+def all_voicings(instrument='guitar', qualities=COMMON_QUALITIES, **options):
+    """ `voicings()` for every root and each of ``qualities``, as a dict of
+    ``{chord name: voicings}``.
+    """
+    return dict(
+        (root + quality, voicings(root + quality, instrument, **options))
+        for root in NOTE_NAMES
+        for quality in qualities
+    )
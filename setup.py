@@ -29,11 +29,12 @@ setup(
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python",
-        "Programming Language :: Python :: 2",
         "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
     ],
     keywords='guitar fretboard chord',
 
     packages=['fretboard'],
     install_requires=requirements,
+    python_requires='>=3.7',
 )